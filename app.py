@@ -1,170 +1,437 @@
-from dash import Dash, dcc, html, Input, Output, callback
+from dash import Dash, dcc, html, Input, Output, State, ClientsideFunction, callback, ctx, no_update
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
-from utils.data_loader import load_and_process_data
-from utils.figures import create_fuel_trend_line_chart, create_fuel_composition_pie, create_pm25_ev_chart
-from utils.components import create_controls, create_summary_cards
-import plotly.express as px  # Add this import at the top
+from utils.data_loader import data_fingerprint, default_region, find_regions, load_and_process_data, release_data_dir
+from utils.figures import (
+    COLORS, create_pm25_ev_chart, trend_traces, build_trend_figure, trend_figure_patch, build_composition_figure,
+    clientside_chart_data, build_pm25_daily_figure, pm25_daily_patch, relayout_x_range
+)
+from utils.components import create_controls, create_summary_cards, control_options
+from utils.config import (
+    BACKGROUND_LOAD, CLIENTSIDE_CALLBACKS, COMPRESS, FIGURE_PATCHES, LAYOUT_SNAPSHOT, REGION_CACHE_SIZE, RELOAD_INTERVAL
+)
+from utils import metrics
+from utils.figure_cache import FigureCache
+from utils.layout_snapshot import LayoutSnapshot
+from utils.regions import RegionCache
+from flask import abort, jsonify, request
+from plotly.io.json import to_json_plotly
+import importlib.util
 
-from dash import Dash, dcc, html, Input, Output, callback
-import dash_bootstrap_components as dbc
-import plotly.express as px
-from utils.data_loader import load_and_process_data
-from utils.figures import create_fuel_trend_line_chart, create_fuel_composition_pie, create_pm25_ev_chart
-from utils.components import create_controls, create_summary_cards
-
-# Load all data
-data = load_and_process_data()
-vehicle_df = data['vehicle_data']
-combined_df = data['combined_data']
-
-# Initialize app
-app = Dash(__name__, external_stylesheets=[dbc.themes.LUX])
-app.title = "Transportation Trends in California"
-
-# Define consistent colors
-COLORS = {
-    'Electric': '#2ca02c',  # Green for electric
-    'Gasoline': '#ff7f0e',  # Orange for gasoline
-    'Diesel': '#1f77b4',  # Blue for diesel
-    'Hybrid': '#9467bd',  # Purple for hybrid
-    'Other': '#7f7f7f'  # Gray for others
-}
+def page_title(region):
+    return f"Transportation Trends in {region}"
 
-# Create layout
-app.layout = dbc.Container([
-    dbc.Row([
-        dbc.Col(html.H1("Transportation Trends in California", className="my-4")),
-        dbc.Row(html.H5("Allie Peterson", className="my-1")),
-        dbc.Row(html.H5("CS150 Community Action Computing, Westmont College", className="my-1")),
-    ]),
 
-    dbc.Row(create_summary_cards(vehicle_df), className="mb-4"),
+# Regions load on first use, in the background unless BACKGROUND_LOAD=0;
+# the default region is loaded straight away and always kept
+available_regions = find_regions()
+regions = RegionCache(
+    load_and_process_data,
+    available_regions,
+    default_region(available_regions),
+    max_regions=REGION_CACHE_SIZE,
+    background=BACKGROUND_LOAD,
+    on_evict=release_data_dir,
+    version=data_fingerprint
+)
+state = regions.get()
+figure_cache = FigureCache()
 
-    dbc.Row([
-        # Left column - Filters and summary cards
-        dbc.Col([
-            # Filters card
-            create_controls(vehicle_df),
-
-            # Data summary card
-            dbc.Card([
-                dbc.CardBody([
-                    html.H4("Data Summary", className="card-title"),
-                    html.Hr(),
-                    html.Div(id='data-summary')
-                ])
-            ], className="shadow-sm mb-4"),
-
-            # Horizontal bar chart card
-            dbc.Card([
-                dbc.CardBody([
-                    dcc.Graph(id='composition-chart')
-                ])
-            ], className="shadow-sm")
-        ], width=3, className="pe-3"),
-
-        # Right column - Main content
+# Pick up new or changed data files without a restart
+if RELOAD_INTERVAL:
+    regions.watch(RELOAD_INTERVAL)
+
+# Initialize app; the dashboard's controls only exist once data is loaded
+app = Dash(
+    __name__,
+    external_stylesheets=[dbc.themes.LUX],
+    suppress_callback_exceptions=True,
+    compress=COMPRESS and importlib.util.find_spec('flask_compress') is not None
+)
+app.title = page_title(regions.default)
+
+# WSGI entry point, e.g. gunicorn -c gunicorn.conf.py (which serves app:server)
+server = app.server
+
+
+def loading_content():
+    """Placeholder shown until the data has loaded"""
+    return dbc.Row(
         dbc.Col([
-            # Main trend chart
-            dbc.Card([
-                dbc.CardBody([
-                    dcc.Graph(
-                        id='trend-chart',
-                        figure=create_fuel_trend_line_chart(vehicle_df)
-                    )
-                ])
-            ], className="mb-4 shadow-sm"),
-
-            # PM2.5 EV chart
-            dbc.Card([
-                dbc.CardBody([
-                    dcc.Graph(
-                        id='pm25-ev-chart',
-                        figure=create_pm25_ev_chart(combined_df)
-                    )
-                ])
-            ], className="shadow-sm")
-        ], width=9)
-    ])
-], fluid=True)
+            dbc.Spinner(color="primary"),
+            html.P("Loading data...", className="text-muted mt-3")
+        ], className="text-center my-5")
+    )
+
+
+def pm25_daily_pyramid(data):
+    """Statewide daily PM2.5 series of a snapshot at every resolution, or None without PM2.5 data"""
+    store = data['pm25_data']
+    return store.daily_pyramid() if store is not None else None
+
+
+def build_dashboard(data, region):
+    """Summary cards, controls and charts for a region's loaded snapshot"""
+    vehicle_df = data['vehicle_data']
+
+    return [
+        dbc.Row(create_summary_cards(data['vehicle_cube']), id='summary-cards', className="mb-4"),
+
+        # Version of the data on screen, compared against the server's after a reload
+        dcc.Store(id='data-version', data=data['version']),
+        dcc.Interval(id='data-poll', interval=max(RELOAD_INTERVAL, 1) * 1000, disabled=not RELOAD_INTERVAL),
+
+        dbc.Row([
+            # Left column - Filters and summary cards
+            dbc.Col([
+                # Filters card
+                create_controls(
+                    vehicle_df, zip_filter=data['zip_store'] is not None and not CLIENTSIDE_CALLBACKS, region=region
+                ),
+
+                # Year x fuel aggregate for the clientside callback
+                dcc.Store(
+                    id='chart-data',
+                    data=clientside_chart_data(data['vehicle_cube']) if CLIENTSIDE_CALLBACKS else None
+                ),
+
+                # Data summary card
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H4("Data Summary", className="card-title"),
+                        html.Hr(),
+                        html.Div(id='data-summary')
+                    ])
+                ], className="shadow-sm mb-4"),
+
+                # Horizontal bar chart card
+                dbc.Card([
+                    dbc.CardBody([
+                        dcc.Graph(id='composition-chart')
+                    ])
+                ], className="shadow-sm")
+            ], width=3, className="pe-3"),
+
+            # Right column - Main content
+            dbc.Col([
+                # Main trend chart
+                dbc.Card([
+                    dbc.CardBody([
+                        dcc.Graph(
+                            id='trend-chart',
+                            figure=build_trend_figure(trend_traces(vehicle_df, data['vehicle_cube'].electric_fuels))
+                        )
+                    ])
+                ], className="mb-4 shadow-sm"),
+
+                # PM2.5 EV chart
+                dbc.Card([
+                    dbc.CardBody([
+                        dcc.Graph(
+                            id='pm25-ev-chart',
+                            figure=create_pm25_ev_chart(data['combined_data'], data['pm25_ev'])
+                        )
+                    ])
+                ], className="mb-4 shadow-sm"),
+
+                # Daily PM2.5 chart, redrawn at finer resolution as it is zoomed
+                dbc.Card([
+                    dbc.CardBody([
+                        dcc.Graph(
+                            id='pm25-daily-chart',
+                            figure=build_pm25_daily_figure(pm25_daily_pyramid(data), data['version'])
+                        )
+                    ])
+                ], className="shadow-sm")
+            ], width=9)
+        ])
+    ]
+
+
+# The dashboard is built once per region and data version, not on every page load
+_dashboards = {}
+
+
+def dashboard_content(data, region):
+    key = (region, data['version'])
+    if key not in _dashboards:
+        if len(_dashboards) >= REGION_CACHE_SIZE:
+            _dashboards.clear()
+        _dashboards[key] = build_dashboard(data, region)
+    return _dashboards[key]
+
+
+def region_selector():
+    """Region dropdown; hidden when there is only one region"""
+    return dbc.Row(
+        dbc.Col(
+            dcc.Dropdown(
+                id='region-dropdown',
+                options=[{'label': name, 'value': name} for name in regions.names],
+                value=regions.default,
+                clearable=False
+            ),
+            width=3
+        ),
+        className="my-2",
+        style=None if len(regions.names) > 1 else {'display': 'none'}
+    )
+
+
+def page_layout(data):
+    """The whole page for a loaded snapshot, or the loading placeholder for None"""
+    return dbc.Container([
+        dbc.Row([
+            dbc.Col(html.H1(page_title(regions.default), id='page-title', className="my-4")),
+            dbc.Row(html.H5("Allie Peterson", className="my-1")),
+            dbc.Row(html.H5("CS150 Community Action Computing, Westmont College", className="my-1")),
+            region_selector(),
+        ]),
+
+        html.Div(id='page-content', children=dashboard_content(data, regions.default) if data else loading_content()),
+
+        # Polls until the background load finishes, then fills in page-content
+        dcc.Interval(id='load-poll', interval=1000, disabled=data is not None)
+    ], fluid=True)
+
+
+def serve_layout():
+    return page_layout(state.snapshot)
+
+
+# Create layout
+app.layout = serve_layout
+
+# Page loads are answered with the layout JSON prebuilt for the current data version
+layout_snapshot = LayoutSnapshot(page_layout)
+
+
+def prepare_layout(data):
+    layout_snapshot.get(data['version'], data)
+
+
+def after_fork():
+    """Make the module's shared state usable in a freshly forked worker (gunicorn.conf.py post_fork)"""
+    metrics.after_fork()
+    layout_snapshot.after_fork()
+    regions.after_fork()
+
+
+if LAYOUT_SNAPSHOT:
+    state.on_load = prepare_layout
+    if state.ready:
+        prepare_layout(state.snapshot)
+
+    @app.server.before_request
+    def serve_layout_snapshot():
+        if request.path != f"{app.config.routes_pathname_prefix}_dash-layout":
+            return None
+        data = state.snapshot
+        return layout_snapshot.response(data['version'] if data else None, data, request)
+
+
+def build_chart_outputs(vehicle_cube, selected_fuels, year_range):
+    """Build the trend chart, composition chart and summary figures for a selection"""
+    with metrics.stage('update_charts.filter') as s:
+        # Slice the precomputed year x fuel cube instead of copying and masking vehicle_df
+        filtered_df = vehicle_cube.frame(selected_fuels, year_range)
+        composition = vehicle_cube.composition(selected_fuels, year_range[1])
+        stats = vehicle_cube.summary(selected_fuels, year_range)
+        s.rows = len(filtered_df)
+
+    with metrics.stage('update_charts.figure'):
+        # One bar trace colored from the cube's fuel color table
+        bar_fig = build_composition_figure(*composition, year_range[1])
+
+        # Trend traces only; the layout is built once and reused
+        line_traces = trend_traces(filtered_df, vehicle_cube.electric_fuels)
+
+    return {
+        'line': line_traces,
+        'bar': bar_fig,
+        'stats': stats
+    }
+
+
+def render_summary(stats):
+    """Create summary with electric vehicle emphasis"""
+    if stats is None:
+        return "No data available for selected filters"
+
+    return [
+        html.P(f"📅 Years: {stats['year_min']} to {stats['year_max']}"),
+        html.P(f"🚗 Total Vehicles: {stats['total'] / 1_000_000:,.2f} million"),
+        html.P(f"🔌 Electric Vehicles: {stats['electric_total'] / 1_000_000:,.2f} million",
+               style={'color': COLORS['Electric']}),
+        html.P(f"⛽ Fuel Types: {stats['fuels']}"),
+        html.P(f"📊 Data Points: {stats['data_points']}")
+    ]
 
 
 # Callbacks
 @callback(
+    Output('page-content', 'children'),
+    Output('load-poll', 'disabled'),
+    Output('page-title', 'children'),
+    Input('load-poll', 'n_intervals'),
+    Input('region-dropdown', 'value'),
+    prevent_initial_call=True
+)
+def populate_page(n_intervals, region):
+    """Show a region's dashboard, or the placeholder while it loads"""
+    region = regions.name(region)
+    data = regions.get(region).snapshot
+    title = page_title(region)
+    if data is None:
+        # A newly picked region replaces the current dashboard straight away
+        return loading_content() if ctx.triggered_id == 'region-dropdown' else no_update, False, title
+    return dashboard_content(data, region), True, title
+
+
+# The browser tab follows the heading
+app.clientside_callback(
+    ClientsideFunction(namespace='dashboard', function_name='setDocumentTitle'),
+    Output('page-title', 'title'),
+    Input('page-title', 'children'),
+    prevent_initial_call=True
+)
+
+
+@callback(
+    Output('summary-cards', 'children'),
+    Output('fuel-type-dropdown', 'options'),
+    Output('year-slider', 'min'),
+    Output('year-slider', 'max'),
+    Output('year-slider', 'marks'),
+    Output('chart-data', 'data'),
+    Output('data-version', 'data'),
+    Input('data-poll', 'n_intervals'),
+    State('data-version', 'data'),
+    State('region-dropdown', 'value'),
+    prevent_initial_call=True
+)
+def refresh_controls(n_intervals, shown_version, region):
+    """Update cards and control bounds once a reload has swapped in new data"""
+    data = regions.get(region).snapshot
+    if data is None or data['version'] == shown_version:
+        raise PreventUpdate
+
+    years, fuels = control_options(data['vehicle_data'])
+    return (
+        create_summary_cards(data['vehicle_cube']),
+        [{'label': f, 'value': f} for f in fuels],
+        min(years) if years else 0,
+        max(years) if years else 0,
+        {str(y): str(y) for y in years},
+        clientside_chart_data(data['vehicle_cube']) if CLIENTSIDE_CALLBACKS else no_update,
+        data['version']
+    )
+
+
+def update_charts(selected_fuels, year_range, shown_version=None, zip_prefix=None, region=None):
+    with metrics.stage('update_charts'):
+        result = _update_charts(selected_fuels, year_range, zip_prefix, region)
+
+    if metrics.ENABLED:
+        # Dash encodes the outputs after the callback returns; encode them once
+        # more here so the response size and encoding time get recorded too
+        with metrics.stage('update_charts.serialize') as s:
+            s.bytes = len(to_json_plotly(result))
+    return result
+
+
+def _update_charts(selected_fuels, year_range, zip_prefix, region):
+    data = regions.get(region).snapshot
+    if data is None:
+        return no_update, no_update, no_update
+
+    # The same fuels picked in a different order are the same view
+    zip_prefix = (zip_prefix or '').strip()
+    key = figure_cache.key(data['version'], sorted(set(selected_fuels or [])), list(year_range), zip_prefix)
+    outputs = figure_cache.get(key)
+    if outputs is None:
+        if zip_prefix and data['zip_store'] is not None:
+            # Drill down to the matching zip codes
+            cube = data['zip_store'].cube(zip_prefix)
+        else:
+            cube = data['vehicle_cube']
+        outputs = build_chart_outputs(cube, selected_fuels, year_range)
+        figure_cache.put(key, outputs)
+
+    if FIGURE_PATCHES:
+        line_fig = trend_figure_patch(outputs['line'])
+    else:
+        line_fig = build_trend_figure(outputs['line'])
+
+    return line_fig, outputs['bar'], render_summary(outputs['stats'])
+
+
+chart_callback = [
     Output('trend-chart', 'figure'),
     Output('composition-chart', 'figure'),
     Output('data-summary', 'children'),
     Input('fuel-type-dropdown', 'value'),
-    Input('year-slider', 'value')
+    Input('year-slider', 'value'),
+    # Redraw when a reload changes the data under the current selection
+    Input('data-version', 'data')
+]
+if CLIENTSIDE_CALLBACKS:
+    # Filtering and drawing happen in assets/dashboard.js
+    app.clientside_callback(
+        ClientsideFunction(namespace='dashboard', function_name='updateCharts'),
+        *chart_callback,
+        State('chart-data', 'data')
+    )
+else:
+    callback(*chart_callback, Input('zip-filter', 'value'), State('region-dropdown', 'value'))(update_charts)
+
+
+@callback(
+    Output('pm25-daily-chart', 'figure'),
+    Input('pm25-daily-chart', 'relayoutData'),
+    Input('data-version', 'data'),
+    State('region-dropdown', 'value'),
+    prevent_initial_call=True
 )
-def update_charts(selected_fuels, year_range):
-    filtered_df = vehicle_df.copy()
-
-    # Apply fuel type filter
-    if selected_fuels:
-        filtered_df = filtered_df[filtered_df['Fuel'].isin(selected_fuels)]
-
-    # Apply year range filter
-    filtered_df = filtered_df[
-        (filtered_df['year'] >= year_range[0]) &
-        (filtered_df['year'] <= year_range[1])
-        ]
-
-    # Create figures with consistent coloring
-    line_fig = create_fuel_trend_line_chart(filtered_df)
-
-    # Update colors for all charts to make Electric consistently green
-    for trace in line_fig.data:
-        if 'Electric' in trace.name:
-            trace.line.color = COLORS['Electric']
-
-    # Create horizontal bar chart with consistent coloring
-    year_df = filtered_df[filtered_df['year'] == year_range[1]]
-    if not year_df.empty:
-        year_df['Percentage'] = (year_df['Vehicles'] / year_df['Vehicles'].sum()) * 100
-
-        # Assign colors based on fuel type
-        year_df['Color'] = year_df['Fuel'].apply(
-            lambda x: COLORS['Electric'] if 'Electric' in x
-            else COLORS.get(x.split()[0], COLORS['Other'])
-        )
-
-        bar_fig = px.bar(
-            year_df.sort_values('Percentage', ascending=True),
-            x='Percentage',
-            y='Fuel',
-            orientation='h',
-            title=f'Fuel Composition ({year_range[1]})',
-            labels={'Percentage': 'Percentage (%)', 'Fuel': 'Fuel Type'},
-            color='Fuel',
-            color_discrete_map={
-                fuel: COLORS['Electric'] if 'Electric' in fuel else COLORS.get(fuel.split()[0], COLORS['Other'])
-                for fuel in year_df['Fuel'].unique()
-            },
-            height=400
-        )
-        bar_fig.update_layout(showlegend=False)
-    else:
-        bar_fig = px.bar(title="No data available")
+def update_pm25_daily(relayout_data, shown_version, region):
+    """Redraw the daily PM2.5 chart at the resolution of its visible date range"""
+    data = regions.get(region).snapshot
+    if data is None:
+        raise PreventUpdate
 
-    # Create summary with electric vehicle emphasis
-    if filtered_df.empty:
-        summary = "No data available for selected filters"
-    else:
-        total = filtered_df['Vehicles'].sum() / 1_000_000
-        electric_total = filtered_df[filtered_df['Fuel'].str.contains('Electric')]['Vehicles'].sum() / 1_000_000
-        year_min, year_max = filtered_df['year'].min(), filtered_df['year'].max()
-        fuels = len(filtered_df['Fuel'].unique())
-
-        summary = [
-            html.P(f"📅 Years: {year_min} to {year_max}"),
-            html.P(f"🚗 Total Vehicles: {total:,.2f} million"),
-            html.P(f"🔌 Electric Vehicles: {electric_total:,.2f} million", style={'color': COLORS['Electric']}),
-            html.P(f"⛽ Fuel Types: {fuels}"),
-            html.P(f"📊 Data Points: {len(filtered_df)}")
-        ]
-
-    return line_fig, bar_fig, summary
+    pyramid = pm25_daily_pyramid(data)
+    if ctx.triggered_id == 'data-version':
+        # New data starts again from the whole range
+        return build_pm25_daily_figure(pyramid, data['version'])
+
+    x_range = relayout_x_range(relayout_data)
+    if pyramid is None or x_range is None:
+        raise PreventUpdate
+    with metrics.stage('pm25_daily.window') as s:
+        days, values = pyramid.window(*x_range)
+        s.rows = len(days)
+    return pm25_daily_patch(days, values)
+
+
+@app.server.route('/ready')
+def ready():
+    """Readiness probe: 200 once data is loaded, 503 until then"""
+    if state.ready:
+        return jsonify(ready=True, version=state.snapshot['version'])
+    return jsonify(ready=False, error=state.error), 503
+
+
+@app.server.route('/_cache/stats')
+def cache_stats():
+    return jsonify(figure_cache.stats())
+
+
+@app.server.route('/_metrics')
+def metrics_snapshot():
+    """Per-stage timings for this process, only answered on localhost"""
+    if request.remote_addr not in ('127.0.0.1', '::1'):
+        abort(403)
+    return jsonify(metrics.snapshot())
 
 
 if __name__ == '__main__':
@@ -0,0 +1,143 @@
+// Clientside callbacks. updateCharts is the clientside version of
+// app.update_charts, used when CLIENTSIDE_CALLBACKS=1: the year x fuel cube
+// arrives once in the 'chart-data' store and every filter change is answered
+// here without a round-trip to the server.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    dashboard: {
+        setDocumentTitle: function (title) {
+            document.title = title;
+            return title;
+        },
+
+        updateCharts: function (selectedFuels, yearRange, dataVersion, data) {
+            if (!data) {
+                return window.dash_clientside.no_update;
+            }
+
+            // Selected fuel columns in fuel order; no selection means every fuel
+            var cols = [];
+            data.fuels.forEach(function (fuel, code) {
+                if (!selectedFuels || selectedFuels.length === 0 || selectedFuels.indexOf(fuel) !== -1) {
+                    cols.push(code);
+                }
+            });
+            var yearIdx = [];
+            data.years.forEach(function (year, i) {
+                if (year >= yearRange[0] && year <= yearRange[1]) {
+                    yearIdx.push(i);
+                }
+            });
+
+            // Trend traces, in the order fuels first appear like px.line
+            var traces = {};
+            var order = [];
+            var total = 0, electricTotal = 0, dataPoints = 0;
+            var fuelsSeen = {}, yearsSeen = [];
+            yearIdx.forEach(function (i) {
+                var yearHasData = false;
+                cols.forEach(function (code) {
+                    if (data.rows[i][code] === 0) {
+                        return;
+                    }
+                    var fuel = data.fuels[code];
+                    if (!(fuel in traces)) {
+                        traces[fuel] = {x: [], y: [], electric: data.is_electric[code]};
+                        order.push(fuel);
+                    }
+                    traces[fuel].x.push(data.years[i]);
+                    traces[fuel].y.push(data.vehicles[i][code] / 1000000);
+
+                    total += data.vehicles[i][code];
+                    if (data.is_electric[code]) {
+                        electricTotal += data.vehicles[i][code];
+                    }
+                    dataPoints += data.rows[i][code];
+                    fuelsSeen[fuel] = true;
+                    yearHasData = true;
+                });
+                if (yearHasData) {
+                    yearsSeen.push(data.years[i]);
+                }
+            });
+
+            var lineData = order.map(function (fuel, i) {
+                return {
+                    type: 'scatter',
+                    mode: 'lines',
+                    name: fuel,
+                    legendgroup: fuel,
+                    x: traces[fuel].x,
+                    y: traces[fuel].y,
+                    line: {
+                        color: traces[fuel].electric ? data.electric_color : data.colorway[i % data.colorway.length],
+                        dash: 'solid'
+                    },
+                    hovertemplate: 'Fuel=' + fuel + '<br>Year=%{x}<br>Vehicles (millions)=%{y}<extra></extra>'
+                };
+            });
+            var lineFig = {
+                data: lineData,
+                layout: Object.assign({}, data.trend_layout, {
+                    title: {text: lineData.length ? data.trend_title : 'No Data Available'}
+                })
+            };
+
+            // Composition of the last year in the range, smallest share on top
+            var barFig;
+            var last = data.years.indexOf(yearRange[1]);
+            var bars = [];
+            if (last !== -1) {
+                cols.forEach(function (code) {
+                    if (data.rows[last][code] > 0) {
+                        bars.push({fuel: data.fuels[code], vehicles: data.vehicles[last][code], color: data.bar_colors[code]});
+                    }
+                });
+            }
+            if (bars.length) {
+                var yearTotal = bars.reduce(function (sum, bar) { return sum + bar.vehicles; }, 0);
+                bars.forEach(function (bar) { bar.percentage = bar.vehicles / yearTotal * 100; });
+                bars.sort(function (a, b) { return a.percentage - b.percentage; });
+                var fuels = bars.map(function (bar) { return bar.fuel; });
+                barFig = {
+                    data: [{
+                        type: 'bar',
+                        orientation: 'h',
+                        x: bars.map(function (bar) { return bar.percentage; }),
+                        y: fuels,
+                        marker: {color: bars.map(function (bar) { return bar.color; })},
+                        hovertemplate: 'Fuel Type=%{y}<br>Percentage (%)=%{x}<extra></extra>'
+                    }],
+                    layout: Object.assign({}, data.composition_layout, {
+                        title: {text: 'Fuel Composition (' + yearRange[1] + ')'},
+                        yaxis: Object.assign({}, data.composition_layout.yaxis, {
+                            categoryorder: 'array',
+                            categoryarray: fuels.slice().reverse()
+                        })
+                    })
+                };
+            } else {
+                barFig = {data: [], layout: Object.assign({}, data.composition_layout, {title: {text: 'No data available'}})};
+            }
+
+            // Summary with electric vehicle emphasis
+            if (dataPoints === 0) {
+                return [lineFig, barFig, 'No data available for selected filters'];
+            }
+            var millions = function (n) {
+                return (n / 1000000).toLocaleString('en-US', {minimumFractionDigits: 2, maximumFractionDigits: 2});
+            };
+            var p = function (text, style) {
+                return {namespace: 'dash_html_components', type: 'P', props: {children: text, style: style}};
+            };
+            var summary = [
+                p('📅 Years: ' + yearsSeen[0] + ' to ' + yearsSeen[yearsSeen.length - 1]),
+                p('🚗 Total Vehicles: ' + millions(total) + ' million'),
+                p('🔌 Electric Vehicles: ' + millions(electricTotal) + ' million', {color: data.electric_color}),
+                p('⛽ Fuel Types: ' + Object.keys(fuelsSeen).length),
+                p('📊 Data Points: ' + dataPoints)
+            ];
+
+            return [lineFig, barFig, summary];
+        }
+    }
+});
@@ -0,0 +1,98 @@
+"""Compare the single-trace composition bar with the px.bar-per-fuel version it replaced.
+
+Times the whole chart callback body (build_chart_outputs) both ways over a
+grid of fuel selections and years:
+
+    python benchmarks/bench_composition_bar.py --zip-codes 500
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import plotly.express as px  # noqa: E402
+
+from benchmarks.run_benchmarks import selection_grid  # noqa: E402
+from benchmarks.synthetic import add_scale_arguments, generate_from_args  # noqa: E402
+
+
+def px_chart_outputs(vehicle_cube, selected_fuels, year_range):
+    """build_chart_outputs as it was: a px.bar trace per fuel, colored row by row"""
+    from utils.figures import COLORS, trend_traces
+
+    filtered_df = vehicle_cube.frame(selected_fuels, year_range)
+    line_traces = trend_traces(filtered_df)
+
+    year_df = vehicle_cube.frame(selected_fuels, (year_range[1], year_range[1]))
+    if not year_df.empty:
+        year_df['Percentage'] = (year_df['Vehicles'] / year_df['Vehicles'].sum()) * 100
+        year_df['Color'] = year_df['Fuel'].apply(
+            lambda x: COLORS['Electric'] if 'Electric' in x
+            else COLORS.get(x.split()[0], COLORS['Other'])
+        )
+        bar_fig = px.bar(
+            year_df.sort_values('Percentage', ascending=True),
+            x='Percentage',
+            y='Fuel',
+            orientation='h',
+            title=f'Fuel Composition ({year_range[1]})',
+            labels={'Percentage': 'Percentage (%)', 'Fuel': 'Fuel Type'},
+            color='Fuel',
+            color_discrete_map={
+                fuel: COLORS['Electric'] if 'Electric' in fuel else COLORS.get(fuel.split()[0], COLORS['Other'])
+                for fuel in year_df['Fuel'].unique()
+            },
+            height=400
+        )
+        bar_fig.update_layout(showlegend=False)
+    else:
+        bar_fig = px.bar(title="No data available")
+
+    return {'line': line_traces, 'bar': bar_fig, 'stats': vehicle_cube.summary(selected_fuels, year_range)}
+
+
+def grid_time(fn, cube, grid, repeats):
+    """Best time over repeats of one pass through the grid, per call"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for fuels, year_range in grid:
+            fn(cube, fuels, year_range)
+        best = min(best, time.perf_counter() - start)
+    return best / len(grid)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeats', type=int, default=3)
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        generate_from_args(Path(tmp) / 'data', args)
+        # Settings are read at import, so they go in before the app is imported
+        os.environ.update({
+            'DATA_DIR': str(Path(tmp) / 'data'),
+            'CACHE_DIR': str(Path(tmp) / 'cache'),
+            'BACKGROUND_LOAD': '0',
+            'RELOAD_INTERVAL': '0'
+        })
+        import app
+
+        cube = app.state.snapshot['vehicle_cube']
+        grid = selection_grid(cube.fuels, cube.years.tolist())
+        before = grid_time(px_chart_outputs, cube, grid, args.repeats)
+        after = grid_time(app.build_chart_outputs, cube, grid, args.repeats)
+
+    print(f"{len(grid)} selections, per call:")
+    print(f"  px.bar per fuel   {before * 1000:8.2f} ms")
+    print(f"  single bar trace  {after * 1000:8.2f} ms")
+    print(f"  speedup           {before / after:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Payload size and time of a long daily series drawn whole versus through a SeriesPyramid.
+
+Draws the full range and a few zoomed windows, as the daily PM2.5 chart's
+relayout callback would:
+
+    python benchmarks/bench_downsample.py --points 1000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np  # noqa: E402
+from plotly.io.json import to_json_plotly  # noqa: E402
+
+from utils.downsample import SeriesPyramid  # noqa: E402
+from utils.figures import pm25_daily_patch, pm25_daily_trace  # noqa: E402
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--points', type=int, default=1_000_000)
+    parser.add_argument('--target', type=int, default=2000, help="Points per trace sent")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    days = np.arange(args.points, dtype=np.int64)
+    values = np.abs(np.cumsum(rng.normal(size=args.points))) + 5
+
+    body, seconds = timed(lambda: to_json_plotly(pm25_daily_trace(days, values)))
+    print(f"{args.points:,} points")
+    print(f"  whole series          {len(body):>12,} bytes {seconds * 1000:9.1f} ms")
+
+    pyramid, seconds = timed(lambda: SeriesPyramid(days, values, points=args.target))
+    print(f"  pyramid build         {seconds * 1000:22.1f} ms  levels {[len(y) for _, y in pyramid.levels]}")
+
+    for method in ('minmax', 'lttb'):
+        for share in (1, 0.1, 0.01, 0.001):
+            x1 = int(args.points * share) - 1
+            body, seconds = timed(lambda: to_json_plotly(pm25_daily_patch(*pyramid.window(0, x1, method=method))))
+            print(f"  {method:6} {share:>7.1%} window {len(body):>12,} bytes {seconds * 1000:9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
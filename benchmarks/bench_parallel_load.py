@@ -0,0 +1,48 @@
+"""Compare sequential and process-pool loading of vehicle files.
+
+    python benchmarks/bench_parallel_load.py --files 2 4 8 --workers 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Measure parsing, not the on-disk cache
+os.environ['DATA_CACHE'] = '0'
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import write_vehicle_file  # noqa: E402
+from utils.data_loader import load_vehicle_data  # noqa: E402
+
+
+def time_load(data_dir, workers, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        load_vehicle_data(data_dir, workers=workers)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--zip-codes', type=int, default=2000)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'files':>5} {'sequential':>11} {'parallel':>9} {'speedup':>8}")
+    for n_files in args.files:
+        with tempfile.TemporaryDirectory() as data_dir:
+            for year in range(2000, 2000 + n_files):
+                write_vehicle_file(data_dir, year, zip_codes=args.zip_codes)
+            sequential = time_load(data_dir, 1, args.repeats)
+            parallel = time_load(data_dir, args.workers, args.repeats)
+        print(f"{n_files:>5} {sequential:>10.2f}s {parallel:>8.2f}s {sequential / parallel:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
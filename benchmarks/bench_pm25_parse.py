@@ -0,0 +1,43 @@
+"""Compare the schema-driven PM2.5 read path with the inferring one.
+
+    python benchmarks/bench_pm25_parse.py --sites 50 200
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import write_pm25_file  # noqa: E402
+from utils.data_loader import read_pm25_csv, read_pm25_csv_fast  # noqa: E402
+
+
+def best_time(fn, path, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sites', type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'sites':>5} {'rows':>8} {'inferred':>9} {'schema':>8} {'speedup':>8}")
+    for sites in args.sites:
+        with tempfile.TemporaryDirectory() as data_dir:
+            path = write_pm25_file(data_dir, 2020, sites=sites)
+            rows = len(read_pm25_csv_fast(path))
+            inferred = best_time(read_pm25_csv, path, args.repeats)
+            schema = best_time(read_pm25_csv_fast, path, args.repeats)
+        print(f"{sites:>5} {rows:>8} {inferred:>8.3f}s {schema:>7.3f}s {inferred / schema:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
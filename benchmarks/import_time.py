@@ -0,0 +1,110 @@
+"""Import-time report for the app's startup path, with a budget to check it against.
+
+Runs `python -X importtime -c "import app"` in a fresh interpreter a few
+times, reports the fastest run's total and its slowest imports, and exits
+with status 1 when the total is over --budget-ms or when a module that
+should only be imported on demand (plotly.express, plotly.subplots) was
+imported at startup:
+
+    python benchmarks/import_time.py --budget-ms 3000
+
+Data loading is left out: the app is imported with an empty data
+directory, so only imports and setup are timed. Loading stays in the
+main thread so no other thread's imports are mixed into the report.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# Modules the startup path must not import; figures.py imports them when first used
+LAZY_MODULES = ('plotly.express', 'plotly.subplots')
+
+LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def startup_env(tmp):
+    """Environment importing the app with an empty data directory under tmp and loading kept in this thread"""
+    (Path(tmp) / 'data').mkdir(exist_ok=True)
+    return {
+        **os.environ,
+        'DATA_DIR': str(Path(tmp) / 'data'),
+        'CACHE_DIR': str(Path(tmp) / 'cache'),
+        'BACKGROUND_LOAD': '0',
+        'RELOAD_INTERVAL': '0'
+    }
+
+
+def import_times(module, env):
+    """[(self_us, cumulative_us, depth, name)] for one import of module in a new interpreter"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((int(self_us), int(cumulative_us), len(indent) // 2, name))
+    return rows
+
+
+def total_us(rows, module):
+    """Cumulative time of the module's own top-level import line"""
+    return next(cumulative for _, cumulative, depth, name in rows if name == module and depth == 0)
+
+
+def by_package(rows):
+    """Self time summed per top-level package, slowest first"""
+    totals = defaultdict(int)
+    for self_us, _, _, name in rows:
+        totals[name.split('.')[0]] += self_us
+    return sorted(totals.items(), key=lambda item: -item[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--module', default='app')
+    parser.add_argument('--runs', type=int, default=3, help="Imports timed; the fastest is reported")
+    parser.add_argument('--budget-ms', type=float, default=3000)
+    parser.add_argument('--top', type=int, default=12, help="Imports and packages listed")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = startup_env(tmp)
+        runs = [import_times(args.module, env) for _ in range(args.runs)]
+    rows = min(runs, key=lambda rows: total_us(rows, args.module))
+    total_ms = total_us(rows, args.module) / 1000
+
+    print(f"import {args.module}: {total_ms:.0f} ms (fastest of {args.runs}, budget {args.budget_ms:.0f} ms)")
+    print(f"\nSlowest imports under {args.module}, cumulative:")
+    direct = [row for row in rows if row[2] == 1]
+    for _, cumulative_us, _, name in sorted(direct, key=lambda row: -row[1])[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+    print("\nSelf time by package:")
+    for package, self_us in by_package(rows)[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {package}")
+
+    failed = False
+    eager = sorted({name for _, _, _, name in rows if name in LAZY_MODULES})
+    if eager:
+        print(f"\nFAIL: imported at startup, should be lazy: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"\nFAIL: import {args.module} took {total_ms:.0f} ms, over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""Load test of the update_charts callback endpoint of a running server.
+
+Waits for /ready, reads the fuels and years from the page layout, then
+posts chart updates for a rotating set of selections from --concurrency
+threads and reports requests/sec and latency percentiles as JSON:
+
+    gunicorn -c gunicorn.conf.py &
+    python benchmarks/load_test.py --url http://127.0.0.1:8050 --duration 30
+
+Needs the server-side chart callback (CLIENTSIDE_CALLBACKS off).
+"""
+import argparse
+import gzip
+import itertools
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+CHART_OUTPUTS = [('trend-chart', 'figure'), ('composition-chart', 'figure'), ('data-summary', 'children')]
+
+
+def fetch(url, data=None, timeout=30):
+    """(status, parsed JSON body) of a GET, or of a POST when data is given"""
+    headers = {'Accept-Encoding': 'gzip'}
+    if data is not None:
+        data = json.dumps(data).encode()
+        headers['Content-Type'] = 'application/json'
+    request = urllib.request.Request(url, data=data, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            status, body, encoding = response.status, response.read(), response.headers.get('Content-Encoding')
+    except urllib.error.HTTPError as e:
+        status, body, encoding = e.code, e.read(), e.headers.get('Content-Encoding')
+    if encoding == 'gzip':
+        body = gzip.decompress(body)
+    return status, json.loads(body) if body else None
+
+
+def wait_ready(url, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if fetch(f"{url}/ready")[0] == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise SystemExit(f"{url} not ready after {timeout}s")
+
+
+def find_component(node, component_id):
+    """Props of the component with component_id in a layout JSON tree"""
+    if isinstance(node, dict):
+        props = node.get('props', {})
+        if props.get('id') == component_id:
+            return props
+        node = list(props.values()) if 'props' in node else list(node.values())
+    if isinstance(node, list):
+        for child in node:
+            found = find_component(child, component_id)
+            if found is not None:
+                return found
+    return None
+
+
+def selections(layout):
+    """Fuel subsets crossed with year ranges, from the layout's own controls"""
+    fuels = [option['value'] for option in find_component(layout, 'fuel-type-dropdown')['options']]
+    slider = find_component(layout, 'year-slider')
+    lo, hi = slider['min'], slider['max']
+    fuel_sets = [[], fuels[:1], fuels[:3], fuels[1:4], fuels]
+    year_ranges = [[lo, hi], [(lo + hi) // 2, hi], [hi, hi]]
+    return list(itertools.product(fuel_sets, year_ranges))
+
+
+def chart_request(selected_fuels, year_range, region):
+    return {
+        'output': '..' + '...'.join(f"{id_}.{prop}" for id_, prop in CHART_OUTPUTS) + '..',
+        'outputs': [{'id': id_, 'property': prop} for id_, prop in CHART_OUTPUTS],
+        'inputs': [
+            {'id': 'fuel-type-dropdown', 'property': 'value', 'value': selected_fuels},
+            {'id': 'year-slider', 'property': 'value', 'value': year_range},
+            {'id': 'data-version', 'property': 'data', 'value': None},
+            {'id': 'zip-filter', 'property': 'value', 'value': None}
+        ],
+        'state': [{'id': 'region-dropdown', 'property': 'value', 'value': region}],
+        'changedPropIds': ['year-slider.value']
+    }
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q / 100 * len(sorted_values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8050')
+    parser.add_argument('--duration', type=float, default=30, help="Seconds to run for")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--region', default=None)
+    parser.add_argument('--ready-timeout', type=float, default=300)
+    parser.add_argument('--output', help="Write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    url = args.url.rstrip('/')
+    wait_ready(url, args.ready_timeout)
+    status, layout = fetch(f"{url}/_dash-layout")
+    requests = [chart_request(fuels, years, args.region) for fuels, years in selections(layout)]
+
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    counter = itertools.count()
+    stop_at = time.monotonic() + args.duration
+
+    def worker():
+        while time.monotonic() < stop_at:
+            body = requests[next(counter) % len(requests)]
+            start = time.perf_counter()
+            try:
+                status, _ = fetch(f"{url}/_dash-update-component", body)
+                error = None if status == 200 else f"HTTP {status}"
+            except OSError as e:
+                error = str(e)
+            elapsed = time.perf_counter() - start
+            with lock:
+                if error is None:
+                    latencies.append(elapsed)
+                else:
+                    errors.append(error)
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for _ in range(args.concurrency):
+            pool.submit(worker)
+    wall = time.monotonic() - started
+
+    latencies.sort()
+    report = {
+        'url': url,
+        'concurrency': args.concurrency,
+        'duration': wall,
+        'selections': len(requests),
+        'requests': len(latencies),
+        'errors': len(errors),
+        'error_samples': sorted(set(errors))[:5],
+        'requests_per_sec': len(latencies) / wall if wall else 0.0,
+        'latency_ms': {
+            'mean': statistics.mean(latencies) * 1000 if latencies else None,
+            'p50': percentile(latencies, 50) * 1000 if latencies else None,
+            'p90': percentile(latencies, 90) * 1000 if latencies else None,
+            'p99': percentile(latencies, 99) * 1000 if latencies else None,
+            'max': latencies[-1] * 1000 if latencies else None
+        }
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
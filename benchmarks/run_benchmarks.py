@@ -0,0 +1,182 @@
+"""Time the data loader, the update_charts callback and the figure builders.
+
+Generates a synthetic dataset at the requested scale (or uses --data-dir)
+and writes machine-readable JSON results:
+
+    python benchmarks/run_benchmarks.py --zip-codes 1700 --output results.json
+"""
+import argparse
+import importlib
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.synthetic import add_scale_arguments, generate_from_args  # noqa: E402
+
+
+def time_call(fn, repeats):
+    """Run fn repeats times and return timing statistics in seconds"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {
+        'repeats': repeats,
+        'min': min(times),
+        'median': statistics.median(times),
+        'mean': statistics.mean(times),
+        'max': max(times)
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def selection_grid(fuels, years, max_fuels=3):
+    """Fuel subsets (including 'all') crossed with year ranges"""
+    fuel_sets = [None] + [list(c) for n in range(1, max_fuels + 1) for c in itertools.combinations(fuels, n)][:20]
+    year_ranges = [[years[0], years[-1]], [years[len(years) // 2], years[-1]], [years[-1], years[-1]]]
+    return list(itertools.product(fuel_sets, year_ranges))
+
+
+def bench_loader(data_dir, cache_dir, repeats):
+    from utils import data_loader
+
+    results = {}
+    # Cold: every file parsed
+    data_loader.artifact_store.enabled = False
+    for cache in (data_loader.vehicle_cache, data_loader.pm25_cache):
+        cache.enabled = False
+    results['load_and_process_data.cold'] = time_call(lambda: data_loader.load_and_process_data(data_dir), repeats)
+
+    # Warm: per-file results come from the on-disk cache
+    for cache in (data_loader.vehicle_cache, data_loader.pm25_cache):
+        cache.enabled = True
+        cache.dir = Path(cache_dir) / cache.dir.name
+    data_loader.load_and_process_data(data_dir)
+    data_loader.vehicle_cache.memory.clear()
+    results['load_and_process_data.warm'] = time_call(lambda: data_loader.load_and_process_data(data_dir), repeats)
+
+    # Restored: the whole snapshot comes from the artifact store by data fingerprint
+    data_loader.artifact_store.enabled = True
+    data_loader.artifact_store.dir = Path(cache_dir) / data_loader.artifact_store.dir.name
+    data_loader.load_and_process_data(data_dir)
+    results['load_and_process_data.restored'] = time_call(lambda: data_loader.load_and_process_data(data_dir), repeats)
+    return results
+
+
+def bench_callbacks(repeats):
+    app = importlib.import_module('app')
+    data = app.state.snapshot
+    grid = selection_grid(data['vehicle_cube'].fuels, data['vehicle_cube'].years.tolist())
+
+    def run_grid():
+        for fuels, year_range in grid:
+            app.update_charts(fuels, year_range)
+
+    stats = time_call(run_grid, repeats)
+    stats['calls'] = len(grid)
+    stats['per_call_mean'] = stats['mean'] / len(grid)
+    return {'update_charts.grid': stats}
+
+
+def bench_figures(repeats):
+    from utils import figures
+
+    data = importlib.import_module('app').state.snapshot
+    vehicle_df = data['vehicle_data']
+    combined_df = data['combined_data']
+    latest_year = int(vehicle_df['year'].max())
+    traces = figures.trend_traces(vehicle_df)
+    pyramid = importlib.import_module('app').pm25_daily_pyramid(data)
+
+    cases = {
+        'create_fuel_trend_line_chart': lambda: figures.create_fuel_trend_line_chart(vehicle_df),
+        'trend_traces': lambda: figures.trend_traces(vehicle_df),
+        'build_trend_figure': lambda: figures.build_trend_figure(traces),
+        'trend_figure_patch': lambda: figures.trend_figure_patch(traces),
+        'create_fuel_composition_pie': lambda: figures.create_fuel_composition_pie(vehicle_df, latest_year),
+        'create_pm25_ev_chart': lambda: figures.create_pm25_ev_chart(combined_df, data['pm25_ev']),
+        'clientside_chart_data': lambda: figures.clientside_chart_data(data['vehicle_cube']),
+        'build_pm25_daily_figure': lambda: figures.build_pm25_daily_figure(pyramid),
+    }
+    return {f"figures.{name}": time_call(fn, repeats) for name, fn in cases.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data-dir', help="Use existing data instead of generating it")
+    parser.add_argument('--output', help="Write JSON here instead of stdout")
+    parser.add_argument('--repeats', type=int, default=5)
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(args.data_dir or Path(tmp) / 'data')
+        if not args.data_dir:
+            generate_from_args(data_dir, args)
+
+        # Settings are read at import, so they go in before the app is imported
+        os.environ.update({
+            'DATA_DIR': str(data_dir),
+            'CACHE_DIR': str(Path(tmp) / 'cache'),
+            'BACKGROUND_LOAD': '0',
+            'RELOAD_INTERVAL': '0',
+            'FIGURE_CACHE_SIZE': '0'
+        })
+
+        results = {}
+        results.update(bench_loader(data_dir, Path(tmp) / 'loader-cache', args.repeats))
+        results.update(bench_callbacks(args.repeats))
+        results.update(bench_figures(args.repeats))
+
+    import numpy
+    import pandas
+    import plotly
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'numpy': numpy.__version__,
+            'pandas': pandas.__version__,
+            'plotly': plotly.__version__,
+            'scale': None if args.data_dir else {
+                'years': args.years,
+                'zip_codes': args.zip_codes,
+                'rows_per_zip': args.rows_per_zip,
+                'fuels': args.fuels,
+                'sites': args.sites
+            }
+        },
+        'results': results
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text)
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Synthetic data files shaped like the real vehicle and EPA downloads.
+
+    python -m benchmarks.synthetic data/ --years 2015 2023 --zip-codes 1700 --sites 100
+"""
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+FUELS = [
+    'Gasoline', 'Diesel and Diesel Hybrid', 'Hybrid Gasoline', 'Battery Electric',
+    'Plug-in Hybrid', 'Flex-Fuel', 'Natural Gas', 'Hydrogen Fuel Cell', 'Other'
+]
+
+
+def write_vehicle_file(data_dir, year, zip_codes=1000, rows_per_zip=20, fuels=len(FUELS), seed=0):
+    """Write data_dir/vehicle<year>.csv with zip_codes * rows_per_zip rows over the first `fuels` fuels"""
+    rng = np.random.default_rng(seed + year)
+    n = zip_codes * rows_per_zip
+    df = pd.DataFrame({
+        'Date': f"1/1/{year}",
+        'Zip Code': np.repeat(np.arange(90001, 90001 + zip_codes), rows_per_zip),
+        'Model Year': rng.integers(1990, year + 1, n),
+        'Fuel': rng.choice(FUELS[:fuels], n),
+        'Make': rng.choice(['TOYOTA', 'FORD', 'TESLA', 'HONDA'], n),
+        'Duty': rng.choice(['Light', 'Heavy'], n),
+        'Vehicles': rng.integers(1, 500, n),
+    })
+    path = Path(data_dir) / f"vehicle{year}.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+def write_pm25_file(data_dir, year, sites=50, seed=0):
+    """Write data_dir/pm2.5-<year>.csv with one reading per site per day"""
+    rng = np.random.default_rng(seed + year)
+    days = pd.date_range(f"{year}-01-01", f"{year}-12-31")
+    n = len(days) * sites
+    site_ids = 60000000 + np.arange(sites) * 37
+    df = pd.DataFrame({
+        'Date': np.tile(days.strftime('%m/%d/%Y'), sites),
+        'Source': 'AQS',
+        'Site ID': np.repeat(site_ids, len(days)),
+        'POC': 1,
+        'Daily Mean PM2.5 Concentration': rng.gamma(2.0, 5.0, n).round(1),
+        'Units': 'ug/m3 LC',
+        'Daily AQI Value': rng.integers(0, 150, n),
+        'Local Site Name': np.repeat([f"Site {i}" for i in range(sites)], len(days)),
+        'Daily Obs Count': 1,
+        'Percent Complete': 100.0,
+        'AQS Parameter Code': 88101,
+        'AQS Parameter Description': 'PM2.5 - Local Conditions',
+        'Method Code': 170,
+        'CBSA Code': 31080,
+        'CBSA Name': 'Los Angeles-Long Beach-Anaheim, CA',
+        'State FIPS Code': 6,
+        'State': 'California',
+        'County FIPS Code': 37,
+        'County': 'Los Angeles',
+        'Site Latitude': 34.0,
+        'Site Longitude': -118.2,
+    })
+    path = Path(data_dir) / f"pm2.5-{year}.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+def generate_dataset(data_dir, years, zip_codes=1000, rows_per_zip=20, fuels=len(FUELS), sites=50, seed=0):
+    """Write one vehicle file and one PM2.5 file per year into data_dir"""
+    data_dir = Path(data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    for year in years:
+        write_vehicle_file(data_dir, year, zip_codes, rows_per_zip, fuels, seed)
+        write_pm25_file(data_dir, year, sites, seed)
+    return data_dir
+
+
+def add_scale_arguments(parser):
+    """Dataset scale options shared by the generator and the benchmarks"""
+    parser.add_argument('--years', type=int, nargs=2, default=[2015, 2023], metavar=('FIRST', 'LAST'))
+    parser.add_argument('--zip-codes', type=int, default=1000)
+    parser.add_argument('--rows-per-zip', type=int, default=20)
+    parser.add_argument('--fuels', type=int, default=len(FUELS))
+    parser.add_argument('--sites', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def generate_from_args(data_dir, args):
+    return generate_dataset(
+        data_dir, range(args.years[0], args.years[1] + 1),
+        args.zip_codes, args.rows_per_zip, args.fuels, args.sites, args.seed
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('data_dir')
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+    print(f"Wrote synthetic data to {generate_from_args(args.data_dir, args)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+"""Render every dashboard view in a grid to files, for report packs.
+
+    python export.py exports/ --fuels all groups each --years all --formats json html csv
+
+Each (fuel set, year range) view gets its trend, composition and PM2.5/EV
+charts written under exports/<view>/, and exports/index.csv lists the
+summary figures of every view. exports/pm25_sites.csv has each PM2.5
+site's least-squares fit of yearly mean PM2.5 against EV counts. Views
+are rendered in a process pool.
+
+exports/manifest.json records a hash of each view's inputs: the vehicle
+rows, composition and PM2.5 figures it would be drawn from. Views whose
+hash matches the last run are skipped, so after a new data file only the
+views it touches are rendered again.
+
+Fuel sets:   all (every fuel together), groups (Electric, Hybrid,
+             Gasoline), each (one fuel at a time), or a comma-separated
+             list of fuel names
+Year ranges: all (every first-last pair), full, each (single years), or
+             FIRST-LAST
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations_with_replacement
+from pathlib import Path
+
+import pandas as pd
+import plotly.io as pio
+from plotly.io.json import to_json_plotly
+
+from utils.config import DEFAULT_REGION
+from utils.data_loader import data_version, load_and_process_data
+from utils.figure_cache import FigureCache
+from utils.figures import (
+    build_composition_figure, build_trend_figure, correlation_note, create_pm25_ev_chart, rolling_points,
+    trend_traces
+)
+from utils.fuels import FUEL_GROUPS
+
+# Bump when the files written for a view change, so every view is rendered again
+EXPORT_VERSION = 1
+
+FORMATS = ('json', 'html', 'csv')
+
+# PM2.5/EV statistics for the PM2.5 chart, set once per worker process
+_analytics = None
+
+
+def _slug(text):
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+
+def fuel_sets(fuels, specs):
+    """(label, fuels) pairs for the fuel set specs; fuels None means every fuel"""
+    sets = []
+    for spec in specs:
+        if spec == 'all':
+            sets.append(('all', None))
+        elif spec == 'groups':
+            for group in FUEL_GROUPS:
+                members = [fuel for fuel in fuels if group in fuel]
+                if members:
+                    sets.append((f"all-{_slug(group)}", members))
+        elif spec == 'each':
+            sets.extend((_slug(fuel), [fuel]) for fuel in fuels)
+        else:
+            members = [name.strip() for name in spec.split(',') if name.strip()]
+            unknown = [name for name in members if name not in fuels]
+            if unknown:
+                raise ValueError(f"unknown fuel {', '.join(unknown)}")
+            label = '+'.join(_slug(name) for name in members)
+            if len(label) > 60:
+                label = f"{label[:40]}-{FigureCache.key(members)[:8]}"
+            sets.append((label, members))
+    return list(dict(sets).items())
+
+
+def year_ranges(years, specs):
+    """Inclusive (first, last) year pairs for the year range specs"""
+    ranges = []
+    for spec in specs:
+        if spec == 'all':
+            ranges.extend(combinations_with_replacement(years, 2))
+        elif spec == 'full':
+            ranges.append((years[0], years[-1]))
+        elif spec == 'each':
+            ranges.extend((year, year) for year in years)
+        else:
+            first, _, last = spec.partition('-')
+            ranges.append((int(first), int(last or first)))
+    return list(dict.fromkeys(ranges))
+
+
+def view_task(data, rolling, note, label, fuels, year_range, formats, region=DEFAULT_REGION):
+    """Everything a worker needs to render one view, and the hash of it"""
+    cube = data['vehicle_cube']
+    combined = data['combined_data']
+    first, last = year_range
+    task = {
+        'slug': f"{first}-{last}_{label}",
+        'region': region,
+        'electric': cube.electric_fuels,
+        'fuels': fuels,
+        'year_range': year_range,
+        'x_range': (first - 0.5, last + 0.5),
+        'formats': formats,
+        'frame': cube.frame(fuels, year_range),
+        'composition': cube.composition(fuels, last),
+        'stats': cube.summary(fuels, year_range),
+        'combined': combined[(combined['year'] >= first) & (combined['year'] <= last)]
+    }
+    # The PM2.5 chart, its rolling average and note are only drawn for two or more years
+    if len(task['combined']) < 2:
+        rolling, note = rolling.iloc[:0], None
+    task['key'] = FigureCache.key(
+        EXPORT_VERSION, sorted(formats), region, fuels, year_range, task['stats'], note,
+        data_version(task['frame'], task['combined'], rolling_points(rolling, task['x_range'])),
+        task['composition'][0], task['composition'][1].tolist()
+    )
+    return task
+
+
+def _init_worker(analytics):
+    global _analytics
+    _analytics = analytics
+
+
+def render_view(task, out_dir):
+    """Write one view's files; returns an error message, or None"""
+    try:
+        last = task['year_range'][1]
+        figures = {
+            'trend': build_trend_figure(trend_traces(task['frame'], task['electric'])),
+            'composition': build_composition_figure(*task['composition'], last),
+            'pm25_ev': create_pm25_ev_chart(task['combined'], _analytics, task['x_range'])
+        }
+
+        view_dir = Path(out_dir) / task['slug']
+        view_dir.mkdir(parents=True, exist_ok=True)
+        if 'json' in task['formats']:
+            charts = {'fuels': task['fuels'], 'year_range': task['year_range'], 'summary': task['stats'], **figures}
+            (view_dir / 'charts.json').write_text(to_json_plotly(charts))
+        if 'html' in task['formats']:
+            # plotly.js is loaded once, with the first chart
+            parts = [
+                pio.to_html(fig, full_html=False, include_plotlyjs='cdn' if i == 0 else False)
+                for i, fig in enumerate(figures.values())
+            ]
+            title = f"{task['slug']} - Transportation Trends in {task['region']}"
+            (view_dir / 'report.html').write_text(
+                f"<html><head><meta charset=\"utf-8\"><title>{title}</title></head>"
+                f"<body>{''.join(parts)}</body></html>"
+            )
+        if 'csv' in task['formats']:
+            task['frame'].to_csv(view_dir / 'vehicles.csv', index=False)
+            task['combined'].to_csv(view_dir / 'pm25_ev.csv', index=False)
+        return None
+    except Exception as e:
+        return str(e)
+
+
+def export(out_dir, fuel_specs=('all', 'groups', 'each'), year_specs=('all',), formats=FORMATS,
+           data_dir=None, region=None, workers=None, force=False):
+    """Render the grid of views to out_dir; returns (rendered, skipped, failed) counts"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / 'manifest.json'
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except (OSError, ValueError):
+        manifest = {}
+
+    data = load_and_process_data(data_dir, region=region)
+    cube = data['vehicle_cube']
+    analytics = data['pm25_ev']
+    rolling = analytics.rolling(12)
+    note = correlation_note(analytics) if analytics.years else None
+
+    tasks = [
+        view_task(data, rolling, note, label, fuels, year_range, formats, region or DEFAULT_REGION)
+        for year_range in year_ranges(cube.years.tolist(), year_specs)
+        for label, fuels in fuel_sets(cube.fuels, fuel_specs)
+    ]
+    pending = [
+        task for task in tasks
+        if force or manifest.get(task['slug']) != task['key'] or not (out_dir / task['slug']).exists()
+    ]
+
+    if workers and workers > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending)), initializer=_init_worker,
+                                 initargs=(analytics,)) as pool:
+            errors = list(pool.map(render_view, pending, [out_dir] * len(pending), chunksize=8))
+    else:
+        _init_worker(analytics)
+        errors = [render_view(task, out_dir) for task in pending]
+
+    failed = 0
+    for task, error in zip(pending, errors):
+        if error is not None:
+            print(f"Error exporting {task['slug']}: {error}")
+            manifest.pop(task['slug'], None)
+            failed += 1
+        else:
+            manifest[task['slug']] = task['key']
+    manifest_path.write_text(json.dumps(manifest, indent=1, sort_keys=True))
+
+    # One row per view in the grid, rendered this run or not
+    pd.DataFrame([
+        {
+            'view': task['slug'],
+            'fuel_set': ', '.join(task['fuels']) if task['fuels'] else 'All',
+            'first_year': task['year_range'][0],
+            'last_year': task['year_range'][1],
+            **(task['stats'] or {})
+        }
+        for task in tasks
+    ]).to_csv(out_dir / 'index.csv', index=False)
+    analytics.site_regressions().to_csv(out_dir / 'pm25_sites.csv', index=False)
+
+    return len(pending) - failed, len(tasks) - len(pending), failed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0], epilog=__doc__.split('\n\n', 1)[1],
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('output', nargs='?', default='exports', help="Directory to write to (exports)")
+    parser.add_argument('--fuels', nargs='+', default=['all', 'groups', 'each'], metavar='SET')
+    parser.add_argument('--years', nargs='+', default=['all'], metavar='RANGE')
+    parser.add_argument('--formats', nargs='+', default=list(FORMATS), choices=FORMATS)
+    parser.add_argument('--data-dir', help="Data directory (DATA_DIR)")
+    parser.add_argument('--region', help="Region subdirectory of the data directory")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Render processes; 1 renders in-process")
+    parser.add_argument('--force', action='store_true', help="Render every view, changed or not")
+    args = parser.parse_args()
+
+    try:
+        rendered, skipped, failed = export(
+            args.output, args.fuels, args.years, args.formats,
+            args.data_dir, args.region, args.workers, args.force
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"{rendered} views rendered, {skipped} unchanged, {failed} failed")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""Production server settings: gunicorn -c gunicorn.conf.py
+
+The app is imported once in the master process and the data loaded there
+before any worker is forked, so workers share the loaded frames and the
+memory-mapped stores copy-on-write instead of each loading their own.
+
+    WEB_BIND        address to listen on (0.0.0.0:8050)
+    WEB_WORKERS     worker processes (one per CPU)
+    WEB_THREADS     threads per worker (4)
+    WEB_TIMEOUT     seconds before a silent worker is restarted (60)
+    WEB_GRACEFUL_TIMEOUT  seconds workers get to finish requests on reload or stop (30)
+    WEB_MAX_REQUESTS      recycle a worker after this many requests; 0 never (0)
+
+kill -HUP <master pid> replaces the workers gracefully: each finishes
+its in-flight requests before exiting, and new ones are forked from the
+master with the master's current data. Data file changes are picked up
+by the hot-reload watcher (RELOAD_INTERVAL), in the master and in every
+worker.
+"""
+import multiprocessing
+import os
+
+# Load synchronously: a background loading thread would not survive the fork
+os.environ['BACKGROUND_LOAD'] = '0'
+
+wsgi_app = 'app:server'
+preload_app = True
+
+bind = os.environ.get('WEB_BIND', '0.0.0.0:8050')
+workers = int(os.environ.get('WEB_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.environ.get('WEB_THREADS', 4))
+worker_class = 'gthread' if threads > 1 else 'sync'
+timeout = int(os.environ.get('WEB_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('WEB_GRACEFUL_TIMEOUT', 30))
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+
+accesslog = '-'
+
+
+def when_ready(server):
+    """Load the other regions too, up to the cache size, so workers share them"""
+    import app
+
+    regions = app.regions
+    others = [name for name in regions.names if name != regions.default]
+    for region in others[:regions.max_regions - 1]:
+        regions.get(region)
+    server.log.info(f"Loaded regions: {', '.join(app.regions.loaded())}")
+
+
+def post_fork(server, worker):
+    import app
+
+    app.after_fork()
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.analytics import PM25EVAnalytics
+from utils.pm25_store import PM25_COLUMN
+
+SITES = [101, 102, 103]
+EV = {2017: 1000, 2018: 1500, 2019: 2600, 2020: 3900, 2021: 6100, 2022: 8800}
+
+
+def readings(year, seed, sites=SITES):
+    """A year of daily readings at the sites, with a few missing values"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(f"{year}-01-01", f"{year}-12-31", freq='D')
+    df = pd.DataFrame({
+        'Date': np.tile(dates, len(sites)),
+        'Site ID': np.repeat(sites, len(dates)),
+        PM25_COLUMN: rng.gamma(4.0, 2.5, len(dates) * len(sites))
+    })
+    df.loc[rng.random(len(df)) < 0.05, PM25_COLUMN] = np.nan
+    return df
+
+
+def fresh(pm25_years, ev_by_year):
+    """Engine built in one go from the final data"""
+    engine = PM25EVAnalytics()
+    engine.sync({year: (df, None) for year, df in pm25_years.items()}, ev_by_year)
+    return engine
+
+
+def assert_same(engine, expected):
+    pd.testing.assert_frame_equal(engine.yearly(), expected.yearly())
+    pd.testing.assert_frame_equal(engine.rolling(12), expected.rolling(12))
+    assert engine.correlations(min_pairs=2) == pytest.approx(expected.correlations(min_pairs=2))
+    # Site codes follow first appearance, so compare by site
+    fits = engine.site_regressions().sort_values('site', ignore_index=True)
+    expected_fits = expected.site_regressions().sort_values('site', ignore_index=True)
+    pd.testing.assert_frame_equal(fits, expected_fits, rtol=1e-6)
+
+
+def test_appended_years_match_full_recompute():
+    pm25 = {year: readings(year, year) for year in range(2017, 2023)}
+    engine = PM25EVAnalytics()
+    for year in sorted(pm25):
+        engine.sync({y: (pm25[y], y) for y in pm25 if y <= year}, {y: EV[y] for y in EV if y <= year})
+    assert_same(engine, fresh(pm25, EV))
+
+
+def test_replaced_removed_and_new_site_years_match_full_recompute():
+    pm25 = {year: readings(year, year) for year in range(2017, 2022)}
+    engine = PM25EVAnalytics()
+    engine.sync({year: (df, 'v1') for year, df in pm25.items()}, EV)
+
+    # One year re-issued, one dropped, a new site appearing, an EV count revised
+    pm25[2019] = readings(2019, 99)
+    del pm25[2017]
+    pm25[2022] = readings(2022, 2022, SITES + [104])
+    ev = {**EV, 2020: 4200}
+    del ev[2018]
+    engine.sync({year: (df, 'v2' if year in (2019, 2022) else 'v1') for year, df in pm25.items()}, ev)
+
+    assert_same(engine, fresh(pm25, ev))
+
+
+def test_unchanged_stamp_is_skipped():
+    engine = PM25EVAnalytics()
+    assert engine.update_pm25_year(2020, readings(2020, 1), stamp='a')
+    assert not engine.update_pm25_year(2020, readings(2020, 2), stamp='a')
+
+
+def test_queries_match_direct_computation():
+    pm25 = {year: readings(year, year) for year in range(2017, 2023)}
+    engine = fresh(pm25, EV)
+    daily = pd.concat(pm25.values(), ignore_index=True).dropna()
+
+    yearly = daily.groupby(daily['Date'].dt.year)[PM25_COLUMN].mean()
+    np.testing.assert_allclose(engine.yearly()['Avg PM2.5'], yearly.to_numpy())
+
+    # 12-month window of readings ending at each month
+    monthly = daily.groupby([daily['Date'].dt.year, daily['Date'].dt.month])[PM25_COLUMN].agg(['sum', 'count'])
+    window = monthly.rolling(12, min_periods=1).sum()
+    np.testing.assert_allclose(engine.rolling(12)['Rolling PM2.5'], (window['sum'] / window['count']).to_numpy())
+
+    years = sorted(EV)
+    ev = np.array([EV[year] for year in years], dtype=float)
+    assert engine.correlations()[0] == pytest.approx(np.corrcoef(ev, yearly.loc[years])[0, 1])
+    assert engine.correlations()[1] == pytest.approx(np.corrcoef(ev[:-1], yearly.loc[years[1:]])[0, 1])
+
+    site_means = daily.groupby([daily['Date'].dt.year, 'Site ID'])[PM25_COLUMN].mean().unstack()
+    fits = engine.site_regressions().set_index('site')
+    for site in SITES:
+        slope, intercept = np.polyfit(ev, site_means.loc[years, site], 1)
+        assert fits.loc[site, 'slope'] == pytest.approx(slope)
+        assert fits.loc[site, 'intercept'] == pytest.approx(intercept)
+        assert fits.loc[site, 'years'] == len(years)
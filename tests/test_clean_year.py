@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.data_loader import clean_year, clean_year_series
+
+
+def as_years(series):
+    """Values as ints, with every kind of missing value as None"""
+    return [None if pd.isnull(value) else int(value) for value in series]
+
+
+@pytest.mark.parametrize('years', [
+    pd.Series(['2019', '2020s', 's2021', ' 2022 ', 'n/a', '', None]),
+    pd.Series(['２０１９', '٢٠٢٠', '2021']),
+    pd.Series([2019, '2020', 's2021', 2022.7, None, np.nan, 'none'], dtype=object),
+    pd.Series([2019.0, np.nan, 2020.9, 2021.0]),
+    pd.Series([2019, 2020, 2021]),
+    pd.Series([True, False, True]),
+    pd.Series([np.nan, np.nan]),
+    pd.Series([None, None], dtype=object),
+    pd.Series([], dtype=object)
+], ids=['string', 'fullwidth', 'object-mixed', 'float-with-nan', 'int', 'bool', 'all-nan', 'all-none', 'empty'])
+def test_matches_clean_year(years):
+    assert as_years(clean_year_series(years)) == as_years(years.apply(clean_year))
+
+
+def test_int_dtype_without_missing():
+    assert clean_year_series(pd.Series(['2019', 's2020'])).dtype == 'int64'
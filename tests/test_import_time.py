@@ -0,0 +1,27 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.import_time import LAZY_MODULES, ROOT, import_times, startup_env, total_us
+
+# Generous enough for a loaded CI machine; benchmarks/import_time.py reports the detail
+BUDGET_MS = float(os.environ.get('IMPORT_BUDGET_MS', 3000))
+
+
+@pytest.fixture(scope='module')
+def env(tmp_path_factory):
+    return startup_env(tmp_path_factory.mktemp('startup'))
+
+
+def test_import_within_budget(env):
+    total_ms = min(total_us(import_times('app', env), 'app') for _ in range(3)) / 1000
+    assert total_ms <= BUDGET_MS
+
+
+def test_plotting_helpers_not_imported(env):
+    code = f"import sys, json, app; print(json.dumps([name for name in {LAZY_MODULES!r} if name in sys.modules]))"
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    assert json.loads(result.stdout.splitlines()[-1]) == []
@@ -0,0 +1,261 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+from utils.pm25_store import PM25_COLUMN
+
+# Largest lag, in years either way, kept for EV vs PM2.5 correlations
+MAX_LAG = 3
+
+# Fewest overlapping years for a lag's correlation to be reported
+MIN_PAIRS = 4
+
+
+class Moments:
+    """Running count, sums, sums of squares and cross-product of (x, y) pairs.
+
+    The fields are arrays of any shape, one set of moments per cell (e.g.
+    per site). Pairs are added, or taken back out with sign=-1, in place,
+    so correlations and regressions never need the data they came from.
+    """
+
+    FIELDS = ('n', 'sx', 'sy', 'sxx', 'syy', 'sxy')
+
+    def __init__(self, shape=()):
+        for field in self.FIELDS:
+            setattr(self, field, np.zeros(shape))
+
+    def grow(self, size):
+        """Extend a 1-d set of moments to size cells"""
+        for field in self.FIELDS:
+            values = getattr(self, field)
+            setattr(self, field, np.pad(values, (0, size - len(values))))
+
+    def add(self, x, y, sign=1):
+        """Add (or with sign=-1 remove) pairs; a NaN on either side skips the pair"""
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        valid = ~(np.isnan(x) | np.isnan(y))
+        x = np.where(valid, x, 0.0)
+        y = np.where(valid, y, 0.0)
+        self.n = self.n + sign * valid
+        self.sx = self.sx + sign * x
+        self.sy = self.sy + sign * y
+        self.sxx = self.sxx + sign * x * x
+        self.syy = self.syy + sign * y * y
+        self.sxy = self.sxy + sign * x * y
+
+    def _centered(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            n = np.where(self.n >= 2, self.n, np.nan)
+            return (
+                n,
+                self.sxx - self.sx * self.sx / n,
+                self.syy - self.sy * self.sy / n,
+                self.sxy - self.sx * self.sy / n
+            )
+
+    def correlation(self):
+        n, var_x, var_y, cov = self._centered()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return cov / np.sqrt(var_x * var_y)
+
+    def slope(self):
+        n, var_x, var_y, cov = self._centered()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return cov / var_x
+
+    def intercept(self):
+        n, var_x, var_y, cov = self._centered()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (self.sy - cov / var_x * self.sx) / n
+
+
+class PM25EVAnalytics:
+    """Sufficient statistics relating PM2.5 to electric vehicle counts, kept up to date per year.
+
+    Each year of PM2.5 readings is reduced once to counts, sums and sums
+    of squares per site and per month. On top of those the engine keeps
+    Moments of (EV count, mean PM2.5) pairs: per site across years for the
+    regressions, and statewide for each lag up to max_lag years. Adding,
+    replacing or removing a year, or changing a year's EV count, only
+    takes that year's pairs out and puts the new ones in; nothing is
+    recomputed from the readings of other years. Queries read the moments
+    and take time independent of the number of readings.
+    """
+
+    def __init__(self, max_lag=MAX_LAG):
+        self.max_lag = max_lag
+        self.sites = []
+        self.site_codes = {}
+        self.years = {}
+        self.ev = {}
+        self.site_fit = Moments((0,))
+        self.lags = {lag: Moments() for lag in range(-max_lag, max_lag + 1)}
+        self._monthly = None
+
+    def copy(self):
+        """Independent copy, e.g. to hand to readers while this one keeps updating"""
+        return copy.deepcopy(self)
+
+    # Ingest
+
+    def _site_codes(self, site_ids):
+        for site in site_ids:
+            if site not in self.site_codes:
+                self.site_codes[site] = len(self.sites)
+                self.sites.append(site)
+        self.site_fit.grow(len(self.sites))
+        return self.site_codes
+
+    def update_pm25_year(self, year, df, stamp=None):
+        """Ingest one year of daily readings (Date, Site ID, concentration)
+
+        A year already ingested with the same stamp is skipped; otherwise
+        its old statistics are replaced. Returns whether anything changed.
+        """
+        year = int(year)
+        if year in self.years and stamp is not None and self.years[year]['stamp'] == stamp:
+            return False
+
+        df = df[df[PM25_COLUMN].notnull()]
+        codes = self._site_codes(int(s) for s in df['Site ID'].unique())
+        site = df['Site ID'].map(codes).to_numpy(dtype=np.int64)
+        month = df['Date'].dt.month.to_numpy() - 1
+        values = df[PM25_COLUMN].to_numpy(dtype=np.float64)
+
+        entry = {
+            'stamp': stamp,
+            'site_n': np.bincount(site, minlength=len(self.sites)).astype(float),
+            'site_sum': np.bincount(site, values, len(self.sites)),
+            'site_sumsq': np.bincount(site, values * values, len(self.sites)),
+            'month_n': np.bincount(month, minlength=12).astype(float),
+            'month_sum': np.bincount(month, values, 12),
+            'month_sumsq': np.bincount(month, values * values, 12)
+        }
+
+        if year in self.years:
+            self._pm25_pairs(year, -1)
+        self.years[year] = entry
+        self._pm25_pairs(year, 1)
+        self._monthly = None
+        return True
+
+    def remove_pm25_year(self, year):
+        if year in self.years:
+            self._pm25_pairs(year, -1)
+            del self.years[year]
+            self._monthly = None
+
+    def set_ev(self, year, vehicles):
+        """Set (or with None clear) the EV count of one year"""
+        year = int(year)
+        if self.ev.get(year) == vehicles:
+            return
+        if year in self.ev:
+            self._ev_pairs(year, -1)
+            del self.ev[year]
+        if vehicles is not None:
+            self.ev[year] = vehicles
+            self._ev_pairs(year, 1)
+
+    def sync(self, pm25_years, ev_by_year):
+        """Bring the engine up to date with {year: (frame, stamp)} and {year: EV count}
+
+        Only years that are new, changed or gone are touched.
+        """
+        for year in set(self.years) - set(pm25_years):
+            self.remove_pm25_year(year)
+        for year, (df, stamp) in pm25_years.items():
+            self.update_pm25_year(year, df, stamp)
+        for year in set(self.ev) - set(ev_by_year):
+            self.set_ev(year, None)
+        for year, vehicles in ev_by_year.items():
+            self.set_ev(year, float(vehicles))
+
+    def _site_means(self, year):
+        entry = self.years[year]
+        n = np.pad(entry['site_n'], (0, len(self.sites) - len(entry['site_n'])))
+        sums = np.pad(entry['site_sum'], (0, len(self.sites) - len(entry['site_sum'])))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(n > 0, sums / n, np.nan)
+
+    def _state_mean(self, year):
+        entry = self.years[year]
+        n = entry['site_n'].sum()
+        return entry['site_sum'].sum() / n if n else np.nan
+
+    def _pm25_pairs(self, year, sign):
+        """Add or remove every pair that uses year's PM2.5"""
+        if year in self.ev:
+            self.site_fit.add(self.ev[year], self._site_means(year), sign)
+        pm25 = self._state_mean(year)
+        for lag, moments in self.lags.items():
+            if year - lag in self.ev:
+                moments.add(self.ev[year - lag], pm25, sign)
+
+    def _ev_pairs(self, year, sign):
+        """Add or remove every pair that uses year's EV count"""
+        ev = self.ev[year]
+        if year in self.years:
+            self.site_fit.add(ev, self._site_means(year), sign)
+        for lag, moments in self.lags.items():
+            if year + lag in self.years:
+                moments.add(ev, self._state_mean(year + lag), sign)
+
+    # Queries
+
+    def yearly(self):
+        """Statewide mean PM2.5 by year"""
+        years = sorted(self.years)
+        return pd.DataFrame({
+            'year': np.array(years, dtype=np.int64),
+            'Avg PM2.5': [self._state_mean(year) for year in years]
+        })
+
+    def _monthly_sums(self):
+        """Prefix sums of readings and counts over every month from the first year to the last"""
+        if self._monthly is None:
+            first = min(self.years)
+            n_months = (max(self.years) - first + 1) * 12
+            sums = np.zeros(n_months)
+            counts = np.zeros(n_months)
+            for year, entry in self.years.items():
+                start = (year - first) * 12
+                sums[start:start + 12] = entry['month_sum']
+                counts[start:start + 12] = entry['month_n']
+            self._monthly = (first, np.concatenate([[0], sums.cumsum()]), np.concatenate([[0], counts.cumsum()]))
+        return self._monthly
+
+    def rolling(self, window=12):
+        """Rolling window-month mean PM2.5 at every month with readings"""
+        if not self.years:
+            return pd.DataFrame(columns=['year', 'month', 'Rolling PM2.5'])
+        first, sums, counts = self._monthly_sums()
+        hi = np.nonzero(np.diff(counts))[0] + 1
+        lo = np.maximum(hi - window, 0)
+        return pd.DataFrame({
+            'year': first + (hi - 1) // 12,
+            'month': (hi - 1) % 12 + 1,
+            'Rolling PM2.5': (sums[hi] - sums[lo]) / (counts[hi] - counts[lo])
+        })
+
+    def lagged_correlation(self, lag=0):
+        """Correlation of EV counts in year t with statewide PM2.5 in year t + lag"""
+        return float(self.lags[lag].correlation())
+
+    def correlations(self, min_pairs=MIN_PAIRS):
+        """{lag: correlation} for every lag with at least min_pairs overlapping years"""
+        return {lag: self.lagged_correlation(lag) for lag, moments in self.lags.items() if moments.n >= min_pairs}
+
+    def site_regressions(self):
+        """Least-squares fit of each site's yearly mean PM2.5 against EV counts, as a frame"""
+        fit = self.site_fit
+        return pd.DataFrame({
+            'site': np.array(self.sites, dtype=np.int64),
+            'years': fit.n.astype(np.int64),
+            'slope': fit.slope(),
+            'intercept': fit.intercept(),
+            'r': fit.correlation()
+        })
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+
+from utils.config import ARTIFACT_STORE_MB, CACHE_DIR, CACHE_ENABLED
+
+
+class ArtifactStore:
+    """Size-bounded on-disk store of derived results, addressed by content.
+
+    Keys are hashes of everything a result was derived from (the data
+    fingerprint plus the request), so an entry never goes stale: changed
+    inputs ask for a new key and the old entry ages out. Each entry is one
+    file under CACHE_DIR/<name>, written with an atomic rename so several
+    processes can share the store. A hit touches the file, so its mtime is
+    the LRU clock, and the least recently used entries are removed once
+    the store holds more than max_bytes. Counters are kept per process.
+    """
+
+    suffix = '.pkl'
+    max_entries = None
+
+    def __init__(self, name='artifacts', max_bytes=ARTIFACT_STORE_MB << 20, cache_dir=None, enabled=CACHE_ENABLED):
+        self.dir = Path(cache_dir or CACHE_DIR) / name
+        self.max_bytes = max_bytes
+        self.enabled = enabled and max_bytes > 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+
+    @staticmethod
+    def key(*parts):
+        """Stable key for any JSON-serializable parts"""
+        return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _dump(self, value, f):
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _load(self, f):
+        return pickle.load(f)
+
+    def get(self, key):
+        """Return the stored value for key, or None on a miss"""
+        if not self.enabled:
+            return None
+
+        path = self.dir / f"{key}{self.suffix}"
+        try:
+            with open(path, 'rb') as f:
+                value = self._load(f)
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            print(f"Error reading {path.name} from {self.dir.name}: {str(e)}")
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Store value under key, then evict down to the size bound"""
+        if not self.enabled:
+            return
+
+        path = self.dir / f"{key}{self.suffix}"
+        try:
+            self.dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                self._dump(value, f)
+            os.replace(tmp_path, path)
+            self._evict()
+        except Exception as e:
+            print(f"Error storing {path.name} in {self.dir.name}: {str(e)}")
+
+    def _evict(self):
+        """Remove least recently used entries beyond max_bytes (and max_entries, if set)"""
+        entries = []
+        for path in self.dir.glob(f"*{self.suffix}"):
+            try:
+                stat = path.stat()
+                entries.append((stat.st_mtime, stat.st_size, path))
+            except FileNotFoundError:
+                continue
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes and (self.max_entries is None or count <= self.max_entries):
+                break
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+            count -= 1
+        self.bytes = total
+
+    def stats(self):
+        """Hit/miss counters for this process"""
+        lookups = self.hits + self.misses
+        return {
+            'pid': os.getpid(),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes
+        }
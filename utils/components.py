@@ -1,15 +1,34 @@
 import dash_bootstrap_components as dbc
 from dash import dcc, html
 
+from utils.config import DEFAULT_REGION
+from utils.fuels import FUEL_GROUPS
 
-def create_controls(df):
-    """Create interactive controls for dashboard"""
+
+def control_options(df):
+    """Sorted years and fuel types available to the controls"""
     if df.empty:
-        years = []
-        fuels = []
-    else:
-        years = sorted(df['year'].unique())
-        fuels = sorted(df['Fuel'].unique())
+        return [], []
+    return sorted(int(y) for y in df['year'].unique()), sorted(str(f) for f in df['Fuel'].unique())
+
+
+def create_controls(df, zip_filter=False, region=DEFAULT_REGION):
+    """Create interactive controls for dashboard"""
+    years, fuels = control_options(df)
+
+    # Optional zip-code drill-down, answered from the zip code store
+    zip_controls = [
+        html.Br(),
+
+        html.Label("Zip Code", className="font-weight-bold"),
+        dcc.Input(
+            id='zip-filter',
+            type='text',
+            placeholder=f"All of {region}, or a zip code / prefix",
+            debounce=True,
+            className="form-control"
+        )
+    ] if zip_filter else []
 
     return dbc.Card([
         dbc.CardBody([
@@ -35,18 +54,19 @@ def create_controls(df):
                 value=[min(years), max(years)] if years else [0, 0],
                 marks={str(y): str(y) for y in years},
                 step=1
-            )
+            ),
+
+            *zip_controls
         ])
     ], className="shadow-sm")
 
 
-def create_summary_cards(df):
-    """Create summary cards for dashboard"""
-    if df.empty:
+def create_summary_cards(cube):
+    """Create summary cards for dashboard from the year x fuel cube"""
+    if not len(cube.years):
         return []
 
-    latest_year = df['year'].max()
-    latest_data = df[df['year'] == latest_year]
+    latest_year = cube.years[-1]
 
     cards = [
         dbc.Col(
@@ -54,7 +74,7 @@ def create_summary_cards(df):
                 dbc.CardBody([
                     html.H6("Total Vehicles", className="card-title"),
                     html.H4(
-                        f"{latest_data['Vehicles'].sum() / 1_000_000:,.1f}M",
+                        f"{cube.vehicles[-1].sum() / 1_000_000:,.1f}M",
                         className="card-text text-primary"
                     ),
                     html.Small(f"in {latest_year}", className="text-muted")
@@ -64,9 +84,8 @@ def create_summary_cards(df):
         )
     ]
 
-    for fuel_type in ['Electric', 'Hybrid', 'Gasoline']:
-        filtered = latest_data[latest_data['Fuel'].str.contains(fuel_type)]
-        total = filtered['Vehicles'].sum() / 1_000_000 if not filtered.empty else 0
+    for fuel_type in FUEL_GROUPS:
+        total = cube.group_totals(fuel_type)[-1] / 1_000_000
 
         color = {
             'Electric': 'success',
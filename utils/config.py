@@ -0,0 +1,53 @@
+import os
+from pathlib import Path
+
+# Runtime settings, overridable through environment variables
+ROOT_DIR = Path(__file__).parent.parent
+DATA_DIR = Path(os.environ.get('DATA_DIR', ROOT_DIR / 'data'))
+CACHE_DIR = Path(os.environ.get('CACHE_DIR', ROOT_DIR / '.cache'))
+CACHE_ENABLED = os.environ.get('DATA_CACHE', '1') != '0'
+
+# Rows per chunk when streaming vehicle CSVs; unset or 0 reads each file whole
+VEHICLE_CHUNK_SIZE = int(os.environ.get('VEHICLE_CHUNK_SIZE', 0)) or None
+
+# Process pool size for reading data files; 0 or 1 reads them one at a time
+LOAD_WORKERS = int(os.environ.get('LOAD_WORKERS', 0))
+
+# Memoized callback outputs: entry count (0 disables), lifetime in seconds and size bound in MB
+FIGURE_CACHE_SIZE = int(os.environ.get('FIGURE_CACHE_SIZE', 256))
+FIGURE_CACHE_TTL = int(os.environ.get('FIGURE_CACHE_TTL', 3600))
+FIGURE_CACHE_MB = int(os.environ.get('FIGURE_CACHE_MB', 64))
+
+# Loaded snapshots kept on disk by data fingerprint, in MB; 0 turns the store off
+ARTIFACT_STORE_MB = int(os.environ.get('ARTIFACT_STORE_MB', 512))
+
+# Send the trend chart as a dash.Patch of its traces instead of a whole figure
+FIGURE_PATCHES = os.environ.get('FIGURE_PATCHES', '1') != '0'
+
+# Filter and draw the charts in the browser instead of in update_charts
+CLIENTSIDE_CALLBACKS = os.environ.get('CLIENTSIDE_CALLBACKS', '0') == '1'
+
+# Load data on a background thread so the server can bind straight away
+BACKGROUND_LOAD = os.environ.get('BACKGROUND_LOAD', '1') != '0'
+
+# Seconds between checks for new or changed data files; 0 turns hot reload off
+RELOAD_INTERVAL = int(os.environ.get('RELOAD_INTERVAL', 10))
+
+# Per-stage timing of data loading and callbacks: 0 (off), 1, or 'memory' to also trace peak allocations
+METRICS = os.environ.get('METRICS', '0')
+
+# Serve /_dash-layout from a prebuilt, gzipped JSON snapshot per data version
+LAYOUT_SNAPSHOT = os.environ.get('LAYOUT_SNAPSHOT', '1') != '0'
+
+# Each subdirectory of DATA_DIR holding data files is a region; files directly in DATA_DIR are this one
+DEFAULT_REGION = os.environ.get('DEFAULT_REGION', 'California')
+
+# Regions kept loaded at once, the default region included; the region last asked for is never dropped
+REGION_CACHE_SIZE = max(int(os.environ.get('REGION_CACHE_SIZE', 4)), 1)
+
+# Gzip responses through flask-compress, when it is installed
+COMPRESS = os.environ.get('COMPRESS', '1') != '0'
+
+# Points per trace sent for long daily series, and how they are picked: 'minmax' or 'lttb'
+DOWNSAMPLE_POINTS = max(int(os.environ.get('DOWNSAMPLE_POINTS', 2000)), 4)
+DOWNSAMPLE_METHOD = os.environ.get('DOWNSAMPLE_METHOD', 'minmax')
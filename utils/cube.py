@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+
+from utils.fuels import fuel_categorical, fuel_color, fuel_group_flags
+
+
+class FuelYearCube:
+    """Dense year x fuel matrix of vehicle counts, built once at load time.
+
+    Fuels are stored as integer codes (column positions) and years as a
+    sorted index, so callbacks answer filters with array slices. Prefix
+    sums over the year axis give range totals without scanning rows.
+    """
+
+    def __init__(self, df):
+        self.years = np.array(sorted(df['year'].unique()), dtype=int)
+        # Category codes of the sorted fuel names are the cube's columns
+        fuel = fuel_categorical(df['Fuel']).remove_unused_categories()
+        self.fuels = list(fuel.categories)
+        self.fuel_codes = {name: code for code, name in enumerate(self.fuels)}
+        # Which fuel columns are in each of FUEL_GROUPS, so no callback matches names again
+        self.group_flags = fuel_group_flags(self.fuels)
+        self.is_electric = self.group_flags['Electric']
+        self.electric_fuels = {fuel for fuel, electric in zip(self.fuels, self.is_electric) if electric}
+        # Bar color of each fuel column, worked out once here rather than per callback
+        self.colors = np.array([fuel_color(name) for name in self.fuels], dtype=object)
+
+        year_idx = np.searchsorted(self.years, df['year'].to_numpy(dtype=int))
+        fuel_idx = fuel.codes.astype(int)
+        shape = (len(self.years), len(self.fuels))
+
+        # Vehicle totals and number of source rows behind each cell
+        self.vehicles = np.zeros(shape, dtype=np.int64)
+        self.rows = np.zeros(shape, dtype=np.int64)
+        np.add.at(self.vehicles, (year_idx, fuel_idx), df['Vehicles'].to_numpy(dtype=np.int64))
+        np.add.at(self.rows, (year_idx, fuel_idx), 1)
+
+        # Prefix sums with a leading zero row: years[lo:hi] sums to cum[hi] - cum[lo]
+        zero_row = np.zeros((1, len(self.fuels)), dtype=np.int64)
+        self.cum_vehicles = np.vstack([zero_row, self.vehicles.cumsum(axis=0)])
+        self.cum_rows = np.vstack([zero_row, self.rows.cumsum(axis=0)])
+
+    def fuel_columns(self, selected_fuels):
+        """Column codes for the selected fuels; no selection means every fuel"""
+        if not selected_fuels:
+            return np.arange(len(self.fuels))
+        # Codes follow the sorted fuel names, so sorting keeps rows in fuel order
+        return np.sort(np.array(
+            [self.fuel_codes[fuel] for fuel in set(selected_fuels) if fuel in self.fuel_codes],
+            dtype=int
+        ))
+
+    def year_bounds(self, year_range):
+        """Row slice [lo, hi) of the years inside an inclusive year range"""
+        lo = np.searchsorted(self.years, year_range[0], side='left')
+        hi = np.searchsorted(self.years, year_range[1], side='right')
+        return lo, max(lo, hi)
+
+    def frame(self, selected_fuels, year_range):
+        """Long-form (Fuel, Vehicles, year) rows for a selection, sorted by year and fuel"""
+        cols = self.fuel_columns(selected_fuels)
+        lo, hi = self.year_bounds(year_range)
+        year_pos, col_pos = np.nonzero(self.rows[lo:hi, cols])
+
+        return pd.DataFrame({
+            'Fuel': [self.fuels[code] for code in cols[col_pos]],
+            'Vehicles': self.vehicles[lo:hi, cols][year_pos, col_pos],
+            'year': self.years[lo:hi][year_pos]
+        })
+
+    def group_totals(self, group):
+        """Vehicles of one fuel group in each year"""
+        return self.vehicles[:, self.group_flags[group]].sum(axis=1)
+
+    def composition(self, selected_fuels, year):
+        """(fuels, vehicles, colors) of the selected fuels with rows in one year"""
+        cols = self.fuel_columns(selected_fuels)
+        i = np.searchsorted(self.years, year)
+        if i == len(self.years) or self.years[i] != year:
+            return [], np.zeros(0, dtype=np.int64), []
+
+        cols = cols[self.rows[i, cols] > 0]
+        return [self.fuels[code] for code in cols], self.vehicles[i, cols], list(self.colors[cols])
+
+    def summary(self, selected_fuels, year_range):
+        """Summary figures for a selection, or None when nothing matches"""
+        cols = self.fuel_columns(selected_fuels)
+        lo, hi = self.year_bounds(year_range)
+
+        rows = self.cum_rows[hi, cols] - self.cum_rows[lo, cols]
+        if rows.sum() == 0:
+            return None
+
+        totals = self.cum_vehicles[hi, cols] - self.cum_vehicles[lo, cols]
+        years_present = self.years[lo:hi][self.rows[lo:hi, cols].any(axis=1)]
+
+        return {
+            'year_min': int(years_present[0]),
+            'year_max': int(years_present[-1]),
+            'total': int(totals.sum()),
+            'electric_total': int(totals[self.is_electric[cols]].sum()),
+            'fuels': int((rows > 0).sum()),
+            'data_points': int(rows.sum())
+        }
+
+    def to_dict(self):
+        """Plain lists of the cube's arrays, e.g. for a dcc.Store"""
+        return {
+            'years': self.years.tolist(),
+            'fuels': list(self.fuels),
+            'is_electric': self.is_electric.tolist(),
+            'vehicles': self.vehicles.tolist(),
+            'rows': self.rows.tolist()
+        }
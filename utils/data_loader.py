@@ -93,10 +93,60 @@
 #         print(f"Error loading data: {str(e)}")
 #         return pd.DataFrame(columns=['Fuel', 'Vehicles', 'year'])
 
+import hashlib
 from pathlib import Path
+import numpy as np
 import pandas as pd
 import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import repeat
+
+from utils.config import DATA_DIR, DEFAULT_REGION, LOAD_WORKERS, VEHICLE_CHUNK_SIZE
+from utils import metrics
+from utils.analytics import PM25EVAnalytics
+from utils.artifact_store import ArtifactStore
+from utils.cube import FuelYearCube
+from utils.file_cache import FileCache
+from utils.fingerprint import fingerprint
+from utils.fuels import FUEL_GROUPS, fuel_categorical, normalize_fuel
+from utils.pm25_store import PM25_COLUMN, PM25Store
+from utils.zip_store import ZipStore
+
+# The only vehicle columns the loader uses; everything else is skipped at read time
+VEHICLE_COLUMNS = {'Zip Code', 'Fuel', 'Vehicles', 'year'}
+
+# Additional cleaning for known fuel types
+FUEL_MAPPING = {
+    'Diesel And Diesel Hybrid': 'Diesel Hybrid',
+    'Hybrid Gasoline': 'Gasoline Hybrid',
+    'Plug In Hybrid': 'Plug-in Hybrid',
+    'Battery Electric': 'Electric',
+    'Flex Fuel': 'Flex-Fuel'
+}
+
+# Per-file results; vehicle aggregates are small enough to also keep in memory
+vehicle_cache = FileCache('vehicle', memory=True, version=3)
+pm25_cache = FileCache('pm25', version=2)
+
+# Columns of the PM2.5 readings kept per file and in the PM2.5 store
+PM25_STORE_COLUMNS = ['Date', 'Site ID', PM25_COLUMN]
+
+# Bump when the cleaning of vehicle or PM2.5 rows changes what the loaders produce
+CLEANING_VERSION = 1
+
+# Loaded snapshots by data fingerprint, reused across restarts on unchanged data;
+# bump SNAPSHOT_VERSION when what a snapshot holds changes
+artifact_store = ArtifactStore('artifacts')
+SNAPSHOT_VERSION = 1
+
+# Running PM2.5/EV statistics per data directory, kept between reloads so
+# only new or changed years are ingested
+pm25_ev_engines = {}
+
+# Declared schema of the EPA daily download, for the fast read path
+PM25_DTYPES = {'Date': 'str', 'Site ID': 'int32', PM25_COLUMN: 'float64'}
+PM25_DATE_FORMAT = '%m/%d/%Y'
 
 
 def clean_year(year_str):
@@ -108,117 +158,522 @@ def clean_year(year_str):
     return int(year_str) if pd.notnull(year_str) else None
 
 
-def load_pm25_data():
-    """Load and process PM2.5 data from multiple year files"""
-    data_dir = Path(__file__).parent.parent / 'data'
-    pm25_files = [f for f in os.listdir(data_dir) if f.startswith('pm2.5-') and f.endswith('.csv')]
-
-    pm25_dfs = []
-    for file_name in pm25_files:
+def clean_year_series(years):
+    """Vectorized clean_year over a whole column"""
+    if pd.api.types.is_bool_dtype(years):
+        return years.apply(clean_year)
+
+    if pd.api.types.is_numeric_dtype(years):
+        # Already numeric: only truncate to whole years
+        cleaned = np.trunc(years.astype(float))
+    elif pd.api.types.infer_dtype(years) in ('string', 'empty', 'mixed', 'mixed-integer'):
+        # Strings keep only their digits; anything else is used as a number
+        digits = years.str.replace(r'\D+', '', regex=True)
+        from_strings = pd.to_numeric(digits.where(digits != ''), errors='coerce')
+        from_values = pd.to_numeric(years.where(digits.isna()), errors='coerce')
+        cleaned = np.trunc(from_strings.fillna(from_values).astype(float))
+        # \D and to_numeric may only know ASCII digits, so text with any other
+        # characters (e.g. fullwidth '２０１９') goes row by row
+        non_ascii = years.str.contains(r'[^\x00-\x7f]', na=False)
+        if non_ascii.any():
+            cleaned[non_ascii] = years[non_ascii].map(clean_year).astype(float)
+    else:
+        # Dates, bytes and other oddities take the original per-row path
+        return years.apply(clean_year)
+
+    if cleaned.isnull().any():
+        return cleaned
+    return cleaned.astype('int64')
+
+
+def read_pm25_csv(file_path):
+    """Read a PM2.5 file with pandas' own column type and date format inference"""
+    df = pd.read_csv(file_path)
+
+    # Standardize column names
+    df.columns = [col.strip() for col in df.columns]
+
+    df['Date'] = pd.to_datetime(df['Date'])
+    df['Site ID'] = df['Site ID'].fillna(-1) if 'Site ID' in df.columns else -1
+    return df[PM25_STORE_COLUMNS]
+
+
+def read_pm25_csv_fast(file_path):
+    """Read a PM2.5 file using the declared EPA schema
+
+    Only the needed columns are parsed, with fixed dtypes and an explicit
+    date format. Raises ValueError when the file doesn't fit the schema.
+    """
+    df = pd.read_csv(file_path, usecols=PM25_STORE_COLUMNS, dtype=PM25_DTYPES)
+
+    dates = pd.to_datetime(df['Date'], format=PM25_DATE_FORMAT, errors='coerce')
+    # Rows written in some other date format go through inference
+    unmatched = dates.isnull() & df['Date'].notnull()
+    if unmatched.any():
+        dates[unmatched] = pd.to_datetime(df.loc[unmatched, 'Date'])
+    df['Date'] = dates
+    return df
+
+
+def pm25_file_year(file_path):
+    """Year in a PM2.5 file name, pm2.5-<year>.csv"""
+    return int(Path(file_path).name.split('-')[1].split('.')[0])
+
+
+def read_pm25_file(file_path):
+    """Read one PM2.5 file, keeping only rows for the year in its name"""
+    year = pm25_file_year(file_path)
+    with metrics.stage('pm25.read', file=Path(file_path).name) as s:
         try:
-            year = int(file_name.split('-')[1].split('.')[0])
-            df = pd.read_csv(data_dir / file_name)
+            df = read_pm25_csv_fast(file_path)
+        except ValueError:
+            df = read_pm25_csv(file_path)
+        s.rows = len(df)
+
+    # Filter for correct year (in case file contains multiple years)
+    df = df[df['Date'].dt.year == year]
+
+    # Only the date, site and concentration are kept; the string columns are dropped
+    return df.astype({'Site ID': 'int64'})
 
-            # Standardize column names
-            df.columns = [col.strip() for col in df.columns]
 
-            # Convert date and extract year/month
-            df['Date'] = pd.to_datetime(df['Date'])
-            df['year'] = df['Date'].dt.year
-            df['month'] = df['Date'].dt.month
+def data_version(*frames):
+    """Short hash of the contents of the given frames"""
+    digest = hashlib.sha1()
+    for df in frames:
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
 
-            # Filter for correct year (in case file contains multiple years)
-            df = df[df['year'] == year]
 
-            if not df.empty:
-                pm25_dfs.append(df)
+def _read_file(reader, file_path, args):
+    """Run reader on one file, returning (result, error message, metrics entries)"""
+    with metrics.collect() as entries:
+        try:
+            result, error = reader(file_path, *args), None
         except Exception as e:
-            print(f"Error loading {file_name}: {str(e)}")
+            result, error = None, str(e)
+    return result, error, entries
+
+
+def _load_files(file_paths, reader, cache, args=(), workers=None, empty_columns=()):
+    """Read each file through the cache, in a process pool when workers > 1
 
-    return pd.concat(pm25_dfs, ignore_index=True) if pm25_dfs else pd.DataFrame()
+    Results come back keyed by path, in file order. A file that fails to
+    load is logged and skipped; one with no usable rows comes back as an
+    empty frame.
+    """
+    results = {}
+    pending = []
+    for file_path in file_paths:
+        cached = cache.get(file_path)
+        if cached is None:
+            pending.append(file_path)
+        else:
+            results[file_path] = cached
 
+    if workers and workers > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+            outcomes = list(pool.map(_read_file, repeat(reader), pending, repeat(args)))
+        # Stage timings recorded in the workers
+        for _, _, entries in outcomes:
+            metrics.merge(entries)
+    else:
+        outcomes = [_read_file(reader, file_path, args) for file_path in pending]
 
-def load_and_process_data():
-    """Load and process both vehicle and PM2.5 data"""
-    # Load vehicle data (existing implementation)
-    vehicle_df = load_vehicle_data()
+    for file_path, (result, error, _) in zip(pending, outcomes):
+        if error is not None:
+            print(f"Error loading {file_path.name}: {error}")
+            continue
+        if result is None:
+            # Cache empty results too, so the file isn't re-read next time
+            result = pd.DataFrame(columns=list(empty_columns))
+        cache.put(file_path, result)
+        results[file_path] = result
 
-    # Load PM2.5 data
-    pm25_df = load_pm25_data()
+    return {file_path: results[file_path] for file_path in file_paths if file_path in results}
 
-    # Aggregate PM2.5 data by year (for merging with vehicle data)
-    pm25_annual = pm25_df.groupby('year')['Daily Mean PM2.5 Concentration'].mean().reset_index()
-    pm25_annual.rename(columns={'Daily Mean PM2.5 Concentration': 'Avg PM2.5'}, inplace=True)
 
-    # Aggregate electric vehicles by year
-    electric_vehicles = vehicle_df[vehicle_df['Fuel'].str.contains('Electric', case=False)]
-    ev_annual = electric_vehicles.groupby('year')['Vehicles'].sum().reset_index()
+def pm25_file_paths(data_dir=None):
+    data_dir = Path(data_dir or DATA_DIR)
+    return [data_dir / f for f in os.listdir(data_dir) if f.startswith('pm2.5-') and f.endswith('.csv')]
 
-    # Merge the datasets
-    combined_df = pd.merge(ev_annual, pm25_annual, on='year', how='outer').sort_values('year')
 
+def vehicle_file_paths(data_dir=None):
+    data_dir = Path(data_dir or DATA_DIR)
+    return [data_dir / f for f in os.listdir(data_dir) if f.startswith("vehicle") and f.endswith(".csv")]
+
+
+def load_pm25_files(data_dir=None, workers=LOAD_WORKERS):
+    """Daily readings of each PM2.5 file that has any, keyed by path"""
+    loaded = _load_files(pm25_file_paths(data_dir), read_pm25_file, pm25_cache, workers=workers)
+    return {file_path: df for file_path, df in loaded.items() if not df.empty}
+
+
+def concat_pm25(pm25_dfs):
+    with metrics.stage('pm25.concat') as s:
+        pm25_df = pd.concat(pm25_dfs, ignore_index=True) if pm25_dfs else pd.DataFrame()
+        s.rows = len(pm25_df)
+    return pm25_df
+
+
+def load_pm25_data(data_dir=None, workers=LOAD_WORKERS):
+    """Load and process PM2.5 data from multiple year files"""
+    return concat_pm25(list(load_pm25_files(data_dir, workers).values()))
+
+
+def update_pm25_ev_analytics(data_dir, pm25_files, ev_annual):
+    """Bring the data directory's PM2.5/EV statistics up to date; returns a copy for the snapshot"""
+    engine = pm25_ev_engines.setdefault(str(Path(data_dir).resolve()), PM25EVAnalytics())
+    with metrics.stage('pm25.analytics'):
+        engine.sync(
+            {pm25_file_year(path): (df, pm25_cache.stamp(path)) for path, df in pm25_files.items()},
+            dict(zip(ev_annual['year'], ev_annual['Vehicles']))
+        )
+        return engine.copy()
+
+
+def release_data_dir(data_dir):
+    """Drop what is kept in memory for a data directory once its region is no longer loaded"""
+    vehicle_cache.forget(data_dir)
+    pm25_ev_engines.pop(str(Path(data_dir).resolve()), None)
+
+
+def _has_data_files(path):
+    return any(
+        (name.startswith('vehicle') or name.startswith('pm2.5-')) and name.endswith('.csv')
+        for name in os.listdir(path)
+    )
+
+
+def find_regions(data_dir=None):
+    """Regions in the data directory, mapped to their load_and_process_data region argument
+
+    Each subdirectory holding vehicle or PM2.5 files is a region named
+    after it. Files directly in the data directory are DEFAULT_REGION; a
+    subdirectory of that name is then skipped, since both can't be shown.
+    """
+    data_dir = Path(data_dir or DATA_DIR)
+    regions = {}
+    try:
+        if _has_data_files(data_dir):
+            regions[DEFAULT_REGION] = None
+        for entry in sorted(os.scandir(data_dir), key=lambda entry: entry.name):
+            if entry.is_dir() and not entry.name.startswith('.') and _has_data_files(entry.path):
+                if entry.name in regions:
+                    print(f"Error loading region {entry.name}: the files directly in {data_dir} are already "
+                          f"{DEFAULT_REGION}; skipping {entry.path}")
+                    continue
+                regions[entry.name] = entry.name
+    except OSError as e:
+        print(f"Error scanning {data_dir}: {str(e)}")
+    return regions or {DEFAULT_REGION: None}
+
+
+def default_region(regions):
+    """DEFAULT_REGION if it has data, else the first region found"""
+    return DEFAULT_REGION if DEFAULT_REGION in regions else next(iter(regions))
+
+
+def cleaning_rules():
+    """Everything besides the files themselves that decides what the loaders produce"""
     return {
-        'vehicle_data': vehicle_df,
-        'pm25_data': pm25_df,
-        'combined_data': combined_df
+        'version': CLEANING_VERSION,
+        'vehicle_columns': sorted(VEHICLE_COLUMNS),
+        'vehicle_cache': vehicle_cache.version,
+        'pm25_columns': PM25_STORE_COLUMNS,
+        'pm25_dtypes': PM25_DTYPES,
+        'pm25_date_format': PM25_DATE_FORMAT,
+        'pm25_cache': pm25_cache.version,
+        'fuel_groups': FUEL_GROUPS
     }
 
 
-def load_vehicle_data():
-    """Original vehicle data loading function"""
-    try:
-        data_dir = Path(__file__).parent.parent / 'data'
-        vehicle_files = [f for f in os.listdir(data_dir) if f.startswith("vehicle") and f.endswith(".csv")]
+def data_fingerprint(data_dir=None):
+    """Fingerprint of a data directory's input files, FUEL_MAPPING and the cleaning rules"""
+    data_dir = Path(data_dir or DATA_DIR)
+    with metrics.stage('fingerprint'):
+        return fingerprint(
+            vehicle_file_paths(data_dir) + pm25_file_paths(data_dir),
+            fuel_mapping=FUEL_MAPPING,
+            cleaning=cleaning_rules()
+        )
+
 
-        combined_data = []
-        for file_name in vehicle_files:
-            year_from_filename = file_name[7:11]
-            try:
-                year_from_filename = int(year_from_filename)
-            except ValueError:
-                year_from_filename = None
+def _snapshot_key(version):
+    return ArtifactStore.key('snapshot', SNAPSHOT_VERSION, version)
 
-            file_path = data_dir / file_name
-            df = pd.read_csv(file_path, low_memory=False)
 
-            if df.empty:
+def restore_snapshot(data_dir, version):
+    """A snapshot stored for this data fingerprint, or None
+
+    The memory-mapped stores aren't pickled, only their paths; if one of
+    them has since been removed the snapshot is rebuilt instead.
+    """
+    with metrics.stage('snapshot.restore'):
+        stored = artifact_store.get(_snapshot_key(version))
+        if stored is None:
+            return None
+
+        stores = {'zip_store': ZipStore, 'pm25_data': PM25Store}
+        snapshot = dict(stored)
+        for name, cls in stores.items():
+            path = stored[name]
+            if path is None:
                 continue
+            if not Path(path).exists():
+                return None
+            os.utime(path)
+            snapshot[name] = cls(path)
+
+        # Later reloads of this directory carry on from the stored statistics
+        pm25_ev_engines.setdefault(str(Path(data_dir).resolve()), snapshot['pm25_ev'].copy())
+        return snapshot
+
+
+def save_snapshot(snapshot):
+    with metrics.stage('snapshot.save'):
+        stored = dict(snapshot)
+        for name in ('zip_store', 'pm25_data'):
+            stored[name] = str(snapshot[name].path) if snapshot[name] is not None else None
+        artifact_store.put(_snapshot_key(snapshot['version']), stored)
+
+
+def load_and_process_data(data_dir=None, chunksize=VEHICLE_CHUNK_SIZE, workers=LOAD_WORKERS, region=None):
+    """Load and process both vehicle and PM2.5 data
+
+    region names a subdirectory of the data directory to load instead of
+    its top level. workers > 1 reads the files of each dataset in a
+    process pool.
+
+    The snapshot's version is the fingerprint of its inputs. A snapshot
+    already built for the same fingerprint, by this process or an earlier
+    one, is restored from the artifact store instead of being rebuilt.
+    """
+    data_dir = Path(data_dir or DATA_DIR)
+    if region:
+        data_dir = data_dir / region
+
+    with metrics.stage('load'):
+        version = data_fingerprint(data_dir)
+        snapshot = restore_snapshot(data_dir, version)
+        if snapshot is not None:
+            return snapshot
+
+        # Load vehicle data, keeping the zip-code level for drill-downs
+        vehicle_files = load_vehicle_files(data_dir, chunksize, workers)
+        vehicle_df = summarize_vehicle_files(vehicle_files)
+
+        # Load PM2.5 data into the memory-mapped store; the frame itself isn't kept
+        pm25_files = load_pm25_files(data_dir, workers)
+        pm25_store = build_pm25_store(pm25_files)
+
+        # Aggregate electric vehicles by year, from the cube's Electric columns
+        vehicle_cube = FuelYearCube(vehicle_df)
+        has_electric = vehicle_cube.rows[:, vehicle_cube.is_electric].any(axis=1)
+        ev_annual = pd.DataFrame({
+            'year': vehicle_cube.years[has_electric],
+            'Vehicles': vehicle_cube.group_totals('Electric')[has_electric]
+        })
+
+        # Running statistics, updated only for new or changed years
+        pm25_ev = update_pm25_ev_analytics(data_dir, pm25_files, ev_annual)
+
+        with metrics.stage('pm25.merge') as s:
+            # Yearly statewide PM2.5 means (for merging with vehicle data)
+            pm25_annual = pm25_ev.yearly()
+
+            # Merge the datasets
+            combined_df = pd.merge(ev_annual, pm25_annual, on='year', how='outer').sort_values('year')
+            s.rows = len(combined_df)
+
+        snapshot = {
+            'vehicle_data': vehicle_df,
+            'vehicle_cube': vehicle_cube,
+            'zip_store': build_zip_store(vehicle_files, version),
+            'pm25_data': pm25_store,
+            'pm25_ev': pm25_ev,
+            'combined_data': combined_df,
+            'version': version
+        }
+        save_snapshot(snapshot)
+        return snapshot
 
-            df['Fuel'] = df['Fuel'].str.strip().str.replace('-', ' ').str.title()
 
-            if 'year' in df.columns:
-                df['year'] = df['year'].apply(clean_year)
-                if df['year'].isnull().all():
-                    df['year'] = year_from_filename
-            else:
-                df['year'] = year_from_filename
+def build_pm25_store(pm25_files):
+    """Memory-mapped PM2.5 store of the files' daily readings, or None if there are none
 
-            df = df[df['year'].notnull()]
+    The store is named by the fingerprint of the PM2.5 files, so the
+    readings are only concatenated and written again when one of those
+    files changed, not when only vehicle files did.
+    """
+    if not pm25_files:
+        return None
+
+    try:
+        version = fingerprint(list(pm25_files), cleaning=cleaning_rules())
+        store = PM25Store.cached(version)
+        if store is not None:
+            return store
+
+        pm25_df = concat_pm25(list(pm25_files.values()))
+        if pm25_df[PM25_COLUMN].isnull().all():
+            return None
+        with metrics.stage('pm25.store', rows=len(pm25_df)):
+            return PM25Store.build(pm25_df, version)
+    except Exception as e:
+        print(f"Error building PM2.5 store: {str(e)}")
+        return None
+
+
+def _add_fuel_sums(running, df):
+    """Fold a chunk's vehicle sums by zip code and fuel into a running total"""
+    with metrics.stage('vehicle.groupby') as s:
+        s.rows = len(df)
+        part = df.groupby(['Zip', 'Fuel'], observed=True)['Vehicles'].sum()
+        if running is None:
+            return part
+        return pd.concat([running, part]).groupby(level=[0, 1]).sum()
 
-            if df.empty:
-                continue
 
-            yearly_data = df.groupby('Fuel', as_index=False)['Vehicles'].sum()
-            yearly_data['year'] = df['year'].iloc[0]
-            combined_data.append(yearly_data)
+def aggregate_vehicle_file(file_path, chunksize=None):
+    """Read one vehicle CSV and sum its vehicles by zip code and fuel type
 
-        if not combined_data:
+    With a chunksize the file is streamed that many rows at a time and only
+    running sums are kept, so memory doesn't grow with the size of the file.
+    """
+    file_name = Path(file_path).name
+    year_from_filename = file_name[7:11]
+    try:
+        year_from_filename = int(year_from_filename)
+    except ValueError:
+        year_from_filename = None
+
+    read_options = dict(usecols=lambda col: col in VEHICLE_COLUMNS, low_memory=False)
+    if chunksize is None:
+        with metrics.stage('vehicle.read', file=file_name) as s:
+            df = pd.read_csv(file_path, **read_options)
+            s.rows = len(df)
+        chunks = [df]
+    else:
+        chunks = metrics.timed_iter(
+            'vehicle.read', pd.read_csv(file_path, chunksize=chunksize, **read_options), file=file_name
+        )
+
+    # Rows with a usable year are summed apart from the rest, since the
+    # filename year is only used when no row in the file has one
+    valid_sums = None
+    other_sums = None
+    first_year = None
+    has_rows = False
+    for df in chunks:
+        if df.empty:
+            continue
+        has_rows = True
+
+        with metrics.stage('vehicle.normalize_fuel') as s:
+            s.rows = len(df)
+            # String cleanup runs on the distinct names only
+            df['Fuel'] = normalize_fuel(df['Fuel'])
+
+        # Out-of-state and other non-numeric zip codes are kept as -1
+        if 'Zip Code' in df.columns:
+            df['Zip'] = pd.to_numeric(df['Zip Code'], errors='coerce').fillna(-1).astype(np.int32)
+        else:
+            df['Zip'] = np.int32(-1)
+
+        with metrics.stage('vehicle.clean_year') as s:
+            s.rows = len(df)
+            if 'year' in df.columns:
+                years = clean_year_series(df['year'])
+                valid = years.notnull()
+            else:
+                valid = pd.Series(False, index=df.index)
+
+        if valid.any():
+            if first_year is None:
+                first_year = years[valid].iloc[0]
+            valid_sums = _add_fuel_sums(valid_sums, df[valid])
+        if first_year is None and not valid.all():
+            other_sums = _add_fuel_sums(other_sums, df[~valid])
+
+    if not has_rows:
+        return None
+
+    if first_year is not None:
+        fuel_sums, year = valid_sums, first_year
+    elif year_from_filename is not None:
+        fuel_sums, year = other_sums, year_from_filename
+    else:
+        return None
+
+    yearly_data = fuel_sums.reset_index()
+    # Chunks each have their own categories; give the file one sorted set
+    yearly_data['Fuel'] = fuel_categorical(yearly_data['Fuel'])
+    yearly_data['year'] = year
+    return yearly_data
+
+
+def load_vehicle_files(data_dir=None, chunksize=VEHICLE_CHUNK_SIZE, workers=LOAD_WORKERS):
+    """Zip-code level (Zip, Fuel, Vehicles, year) aggregates of each vehicle file"""
+    return [
+        yearly_data for yearly_data in _load_files(
+            vehicle_file_paths(data_dir),
+            aggregate_vehicle_file,
+            vehicle_cache,
+            args=(chunksize,),
+            workers=workers,
+            empty_columns=['Zip', 'Fuel', 'Vehicles', 'year']
+        ).values()
+        if not yearly_data.empty
+    ]
+
+
+def summarize_vehicle_files(vehicle_files):
+    """Statewide vehicles by fuel and year from the per-file aggregates"""
+    try:
+        if not vehicle_files:
             raise ValueError("No valid vehicle data found")
 
-        final_df = pd.concat(combined_data, ignore_index=True)
+        with metrics.stage('vehicle.concat') as s:
+            final_df = pd.concat([
+                yearly_data.groupby('Fuel', as_index=False, observed=True)['Vehicles'].sum()
+                .assign(year=yearly_data['year'].iloc[0])
+                for yearly_data in vehicle_files
+            ], ignore_index=True)
+            s.rows = len(final_df)
 
-        fuel_mapping = {
-            'Diesel And Diesel Hybrid': 'Diesel Hybrid',
-            'Hybrid Gasoline': 'Gasoline Hybrid',
-            'Plug In Hybrid': 'Plug-in Hybrid',
-            'Battery Electric': 'Electric',
-            'Flex Fuel': 'Flex-Fuel'
-        }
-        final_df['Fuel'] = final_df['Fuel'].replace(fuel_mapping)
+        # Known fuel names are mapped on the categories, not on every row
+        final_df['Fuel'] = fuel_categorical(final_df['Fuel'], FUEL_MAPPING)
         final_df['year'] = final_df['year'].astype(int)
 
         return final_df.sort_values(['year', 'Fuel'])
 
     except Exception as e:
         print(f"Error loading vehicle data: {str(e)}")
-        return pd.DataFrame(columns=['Fuel', 'Vehicles', 'year'])
\ No newline at end of file
+        return pd.DataFrame(columns=['Fuel', 'Vehicles', 'year'])
+
+
+def build_zip_store(vehicle_files, version):
+    """Memory-mapped zip-code store of the per-file aggregates, or None if there are none"""
+    if not vehicle_files:
+        return None
+
+    try:
+        zip_df = pd.concat(vehicle_files, ignore_index=True)
+        zip_df['Fuel'] = fuel_categorical(zip_df['Fuel'], FUEL_MAPPING)
+        zip_df['year'] = zip_df['year'].astype(int)
+        zip_df = zip_df.groupby(['Zip', 'year', 'Fuel'], as_index=False, observed=True)['Vehicles'].sum()
+        with metrics.stage('zip_store.build', rows=len(zip_df)):
+            return ZipStore.build(zip_df, version)
+    except Exception as e:
+        print(f"Error building zip code store: {str(e)}")
+        return None
+
+
+def load_vehicle_data(data_dir=None, chunksize=VEHICLE_CHUNK_SIZE, workers=LOAD_WORKERS):
+    """Original vehicle data loading function"""
+    try:
+        return summarize_vehicle_files(load_vehicle_files(data_dir, chunksize, workers))
+    except Exception as e:
+        print(f"Error loading vehicle data: {str(e)}")
+        return pd.DataFrame(columns=['Fuel', 'Vehicles', 'year'])
@@ -0,0 +1,95 @@
+import numpy as np
+
+from utils.config import DOWNSAMPLE_METHOD, DOWNSAMPLE_POINTS
+
+
+def min_max(x, y, n_out):
+    """Keep the lowest and highest point of each bucket, at most n_out points in all.
+
+    The series is cut into n_out // 2 buckets of equal point count, so
+    spikes survive however far it is reduced. x must be sorted and y free
+    of NaNs.
+    """
+    n = len(y)
+    if n <= n_out:
+        return x, y
+
+    size = -(-n // max(n_out // 2, 1))
+    pad = -n % size
+    lows = np.concatenate([y, np.full(pad, np.inf)]).reshape(-1, size).argmin(axis=1)
+    highs = np.concatenate([y, np.full(pad, -np.inf)]).reshape(-1, size).argmax(axis=1)
+    starts = np.arange(len(lows)) * size
+    keep = np.unique(np.concatenate([starts + lows, starts + highs]))
+    return x[keep], y[keep]
+
+
+def lttb(x, y, n_out):
+    """Largest-Triangle-Three-Buckets downsampling to n_out points.
+
+    Keeps the first and last points and, from each of the n_out - 2 buckets
+    between them, the point making the largest triangle with the point
+    kept before it and the mean of the next bucket. x must be sorted and
+    numeric, and y free of NaNs.
+    """
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return x, y
+
+    xs = np.asarray(x, dtype=np.float64)
+    ys = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+    # Mean of each bucket, with the last point standing in after the final one
+    mean_x = np.append(np.add.reduceat(xs[:-1], edges[:-1]) / counts, xs[-1])
+    mean_y = np.append(np.add.reduceat(ys[:-1], edges[:-1]) / counts, ys[-1])
+
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs(
+            (xs[a] - mean_x[i + 1]) * (ys[lo:hi] - ys[a]) - (xs[a] - xs[lo:hi]) * (mean_y[i + 1] - ys[a])
+        )
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    return x[keep], y[keep]
+
+
+METHODS = {'minmax': min_max, 'lttb': lttb}
+
+
+class SeriesPyramid:
+    """A long series kept at several resolutions, so any x window can be drawn in a bounded number of points.
+
+    Level 0 is the series itself and each level after it is the one before
+    min/max-downsampled by factor, down to the first level that fits in
+    points. window() slices the finest level with at most factor * points
+    in the visible range and reduces that slice to points, so zooming in
+    shows more detail without ever sending more than points per trace.
+    """
+
+    def __init__(self, x, y, points=DOWNSAMPLE_POINTS, factor=4):
+        x, y = np.asarray(x), np.asarray(y)
+        self.points = points
+        self.factor = factor
+        self.levels = [(x, y)]
+        while len(self.levels[-1][1]) > points:
+            x, y = self.levels[-1]
+            self.levels.append(min_max(x, y, max(len(y) // factor, points)))
+
+    def __len__(self):
+        return len(self.levels[0][1])
+
+    def window(self, x0=None, x1=None, points=None, method=DOWNSAMPLE_METHOD):
+        """(x, y) over [x0, x1] in at most points points; None leaves that end open
+
+        One point beyond each end is included so the line runs to the edges
+        of the plot.
+        """
+        points = points or self.points
+        for x, y in self.levels:
+            lo = 0 if x0 is None else max(int(np.searchsorted(x, x0, side='left')) - 1, 0)
+            hi = len(x) if x1 is None else min(int(np.searchsorted(x, x1, side='right')) + 1, len(x))
+            if hi - lo <= points * self.factor or x is self.levels[-1][0]:
+                return METHODS.get(method, min_max)(x[lo:hi], y[lo:hi], points)
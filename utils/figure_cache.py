@@ -0,0 +1,42 @@
+import json
+import os
+import time
+
+import plotly.utils
+
+from utils.artifact_store import ArtifactStore
+from utils.config import CACHE_ENABLED, FIGURE_CACHE_MB, FIGURE_CACHE_SIZE, FIGURE_CACHE_TTL
+
+
+class FigureCache(ArtifactStore):
+    """LRU cache of serialized callback outputs, shared between workers on disk.
+
+    An ArtifactStore of JSON entries under CACHE_DIR/<name>: keys include
+    the data fingerprint, entries older than ttl seconds are dropped when
+    read, and the least recently used are evicted once there are more than
+    max_entries or max_bytes of them. DATA_CACHE=0 turns it off along
+    with the other caches.
+    """
+
+    suffix = '.json'
+
+    def __init__(self, name='figures', max_entries=FIGURE_CACHE_SIZE, ttl=FIGURE_CACHE_TTL, cache_dir=None,
+                 max_bytes=FIGURE_CACHE_MB << 20, enabled=CACHE_ENABLED):
+        super().__init__(name, max_bytes, cache_dir, enabled=enabled and max_entries > 0)
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+    def _dump(self, value, f):
+        f.write(json.dumps({'created': time.time(), 'value': value}, cls=plotly.utils.PlotlyJSONEncoder).encode())
+
+    def _load(self, f):
+        entry = json.load(f)
+        if time.time() - entry['created'] > self.ttl:
+            f.close()
+            os.remove(f.name)
+            raise FileNotFoundError(f.name)
+        return entry['value']
+
+    def stats(self):
+        """Hit/miss counters for this process"""
+        return {**super().stats(), 'max_entries': self.max_entries, 'ttl': self.ttl}
@@ -1,9 +1,22 @@
-import plotly.express as px
-from plotly.subplots import make_subplots
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+import plotly.io as pio
 import plotly.graph_objects as go
+from dash import Patch
+
+from utils.fuels import COLORS, fuel_group_flags
+from utils.pm25_store import EPOCH
+
+TREND_TITLE = 'Vehicle Trends by Fuel Type'
 
 def create_fuel_trend_line_chart(df):
     """Create line chart of vehicle trends by fuel type"""
+    # plotly.express is slow to import and only these older builders use it
+    import plotly.express as px
+
     if df.empty:
         return px.line(title="No Data Available")
 
@@ -39,8 +52,136 @@ def create_fuel_trend_line_chart(df):
     return fig
 
 
+@lru_cache(maxsize=None)
+def trend_layout():
+    """Layout of the trend chart, resolved once and reused by every figure.
+
+    Matches what create_fuel_trend_line_chart gets from px.line, with the
+    plotly_white template already expanded.
+    """
+    return {
+        'template': pio.templates['plotly_white'].to_plotly_json(),
+        'title': {'text': TREND_TITLE},
+        'xaxis': {'anchor': 'y', 'domain': [0.0, 1.0], 'title': {'text': 'Year'},
+                  'rangeslider': {'visible': False}, 'dtick': 1},
+        'yaxis': {'anchor': 'x', 'domain': [0.0, 1.0], 'title': {'text': 'Vehicles (millions)'}},
+        'legend': {'title': {'text': 'Fuel'}, 'tracegroupgap': 0, 'orientation': 'h',
+                   'yanchor': 'bottom', 'y': 1.02, 'xanchor': 'right', 'x': 1},
+        'margin': {'l': 50, 'r': 50, 'b': 50, 't': 80},
+        'hovermode': 'x unified',
+        'height': 500
+    }
+
+
+def trend_traces(df, electric_fuels=None):
+    """Line traces for the trend chart, one per fuel in order of appearance.
+
+    Colors are set here rather than patched afterwards: Electric fuels are
+    green and the rest follow the template colorway like px.line does.
+    electric_fuels is the set of Electric fuel names, e.g. a cube's
+    electric_fuels; without it the fuels in df are grouped here.
+    """
+    colorway = pio.templates['plotly_white'].layout.colorway
+    if electric_fuels is None:
+        fuels = list(df['Fuel'].unique())
+        electric_fuels = {fuel for fuel, electric in zip(fuels, fuel_group_flags(fuels)['Electric']) if electric}
+    traces = []
+    for i, (fuel, fuel_df) in enumerate(df.groupby('Fuel', sort=False, observed=True)):
+        traces.append({
+            'type': 'scatter',
+            'mode': 'lines',
+            'name': fuel,
+            'legendgroup': fuel,
+            'showlegend': True,
+            'x': fuel_df['year'].to_numpy(),
+            'y': fuel_df['Vehicles'].to_numpy() / 1_000_000,
+            'xaxis': 'x',
+            'yaxis': 'y',
+            'line': {'color': COLORS['Electric'] if fuel in electric_fuels else colorway[i % len(colorway)],
+                     'dash': 'solid'},
+            'hovertemplate': f"Fuel={fuel}<br>Year=%{{x}}<br>Vehicles (millions)=%{{y}}<extra></extra>"
+        })
+    return traces
+
+
+def _trend_title(traces):
+    return TREND_TITLE if traces else "No Data Available"
+
+
+def build_trend_figure(traces):
+    """Full trend figure from prebuilt traces, skipping plotly validation"""
+    return {'data': traces, 'layout': {**trend_layout(), 'title': {'text': _trend_title(traces)}}}
+
+
+def trend_figure_patch(traces):
+    """Partial update that swaps the trend chart's traces and leaves its layout alone"""
+    patch = Patch()
+    patch['data'] = traces
+    patch['layout']['title']['text'] = _trend_title(traces)
+    return patch
+
+
+@lru_cache(maxsize=None)
+def composition_layout():
+    """Layout shared by every composition bar chart, as px.bar lays it out"""
+    return {
+        'template': pio.templates['plotly'].to_plotly_json(),
+        'barmode': 'relative',
+        'height': 400,
+        'showlegend': False,
+        'xaxis': {'anchor': 'y', 'domain': [0.0, 1.0], 'title': {'text': 'Percentage (%)'}},
+        'yaxis': {'anchor': 'x', 'domain': [0.0, 1.0], 'title': {'text': 'Fuel Type'}}
+    }
+
+
+def build_composition_figure(fuels, vehicles, colors, year):
+    """Fuel shares of one year as a single horizontal bar trace, smallest share on top
+
+    Laid out like px.bar(color='Fuel'), but with one trace and a color per
+    bar instead of one trace per fuel, and without plotly validation.
+    """
+    if len(fuels) == 0:
+        return {'data': [], 'layout': {**composition_layout(), 'title': {'text': 'No data available'}}}
+
+    percentages = vehicles / vehicles.sum() * 100
+    order = np.argsort(percentages, kind='stable')
+    sorted_fuels = [fuels[i] for i in order]
+    layout = composition_layout()
+
+    return {
+        'data': [{
+            'type': 'bar',
+            'orientation': 'h',
+            'x': percentages[order],
+            'y': sorted_fuels,
+            'marker': {'color': [colors[i] for i in order]},
+            'hovertemplate': 'Fuel Type=%{y}<br>Percentage (%)=%{x}<extra></extra>'
+        }],
+        'layout': {
+            **layout,
+            'title': {'text': f'Fuel Composition ({year})'},
+            'yaxis': {**layout['yaxis'], 'categoryorder': 'array', 'categoryarray': sorted_fuels[::-1]}
+        }
+    }
+
+
+def clientside_chart_data(cube):
+    """Everything the browser needs to draw the charts and summary on its own"""
+    return {
+        **cube.to_dict(),
+        'bar_colors': list(cube.colors),
+        'colorway': list(pio.templates['plotly_white'].layout.colorway),
+        'electric_color': COLORS['Electric'],
+        'trend_title': TREND_TITLE,
+        'trend_layout': trend_layout(),
+        'composition_layout': composition_layout()
+    }
+
+
 def create_fuel_composition_pie(df, year):
     """Create pie chart of fuel composition for specific year"""
+    import plotly.express as px
+
     if df.empty:
         return px.pie(title="No Data Available")
 
@@ -74,11 +215,110 @@ def create_fuel_composition_pie(df, year):
     return fig
 
 
-def create_pm25_ev_chart(combined_df):
-    """Create dual-axis line chart for PM2.5 and Electric Vehicles over time"""
+PM25_DAILY_TITLE = 'Daily PM2.5, Statewide Mean'
+
+
+def pm25_daily_trace(days, values):
+    """Line trace of daily PM2.5 readings, x as ISO dates"""
+    return {
+        'type': 'scatter',
+        'mode': 'lines',
+        'name': 'PM2.5 (µg/m³)',
+        'x': np.datetime_as_string(EPOCH + np.asarray(days), unit='D'),
+        # Two decimals is well within the monitors' precision and keeps the payload small
+        'y': np.round(np.asarray(values, dtype=np.float64), 2),
+        'line': {'color': '#d62728', 'width': 1},
+        'hovertemplate': '%{x}<br>PM2.5=%{y} µg/m³<extra></extra>'
+    }
+
+
+def build_pm25_daily_figure(pyramid, revision=None):
+    """Daily PM2.5 chart drawn from a SeriesPyramid at its coarsest fitting resolution
+
+    Zooms are kept across updates with the same revision; pm25_daily_patch
+    then fills in the finer slice for the visible dates.
+    """
+    layout = {
+        'template': pio.templates['plotly_white'].to_plotly_json(),
+        'title': {'text': PM25_DAILY_TITLE if pyramid is not None else 'No PM2.5 data available'},
+        'xaxis': {'type': 'date', 'title': {'text': 'Date'}, 'rangeslider': {'visible': False}},
+        'yaxis': {'title': {'text': 'PM2.5 (µg/m³)'}},
+        'margin': {'l': 50, 'r': 50, 'b': 50, 't': 80},
+        'height': 400,
+        'uirevision': revision
+    }
+    if pyramid is None:
+        return {'data': [], 'layout': layout}
+    return {'data': [pm25_daily_trace(*pyramid.window())], 'layout': layout}
+
+
+def pm25_daily_patch(days, values):
+    """Partial update that swaps the daily PM2.5 points and leaves the layout, and so the zoom, alone"""
+    trace = pm25_daily_trace(days, values)
+    patch = Patch()
+    patch['data'][0]['x'] = trace['x']
+    patch['data'][0]['y'] = trace['y']
+    return patch
+
+
+def relayout_x_range(relayout_data):
+    """Day numbers (first, last) a relayout event zoomed the x-axis to
+
+    (None, None) when the axis was reset, and None when the event didn't
+    touch the x range at all (a legend click or a y-only zoom).
+    """
+    relayout_data = relayout_data or {}
+    if relayout_data.get('xaxis.autorange'):
+        return None, None
+    if 'xaxis.range[0]' in relayout_data and 'xaxis.range[1]' in relayout_data:
+        x_range = relayout_data['xaxis.range[0]'], relayout_data['xaxis.range[1]']
+    elif 'xaxis.range' in relayout_data:
+        x_range = relayout_data['xaxis.range']
+    else:
+        return None
+
+    try:
+        return tuple(int((np.datetime64(pd.Timestamp(x), 'D') - EPOCH).astype(np.int64)) for x in x_range)
+    except (TypeError, ValueError):
+        return None
+
+
+def correlation_note(analytics):
+    """One-line summary of how EV counts and PM2.5 move together, or None"""
+    correlations = {lag: r for lag, r in analytics.correlations().items() if not np.isnan(r)}
+    if 0 not in correlations:
+        return None
+
+    note = f"EVs vs PM2.5: r = {correlations[0]:.2f} in the same year"
+    best_lag = max(correlations, key=lambda lag: abs(correlations[lag]))
+    if best_lag != 0:
+        note += f"; strongest with PM2.5 {best_lag:+d} yr (r = {correlations[best_lag]:.2f})"
+    return note
+
+
+def rolling_points(rolling, x_range=None):
+    """Rolling PM2.5 frame with each month placed within its year as x, cropped to x_range if given"""
+    points = pd.DataFrame({
+        'x': rolling['year'] + (rolling['month'] - 1) / 12,
+        'Rolling PM2.5': rolling['Rolling PM2.5']
+    })
+    if x_range is not None:
+        points = points[(points['x'] >= x_range[0]) & (points['x'] <= x_range[1])]
+    return points
+
+
+def create_pm25_ev_chart(combined_df, analytics=None, x_range=None):
+    """Create dual-axis line chart for PM2.5 and Electric Vehicles over time
+
+    With a PM25EVAnalytics, a 12-month rolling PM2.5 average and the EV vs
+    PM2.5 correlation are added. x_range fixes the x axis, and only the
+    rolling average within it is drawn.
+    """
     if combined_df.empty or len(combined_df) < 2:
         return go.Figure()
 
+    from plotly.subplots import make_subplots
+
     # Create figure with secondary y-axis
     fig = make_subplots(specs=[[{"secondary_y": True}]])
 
@@ -108,6 +348,27 @@ def create_pm25_ev_chart(combined_df):
         secondary_y=True,
     )
 
+    note = None
+    if analytics is not None and analytics.years:
+        rolling = rolling_points(analytics.rolling(12), x_range)
+        fig.add_trace(
+            go.Scatter(
+                x=rolling['x'],
+                y=rolling['Rolling PM2.5'],
+                name="PM2.5, 12-month avg",
+                line=dict(color='#ff9896', width=2, dash='dot'),
+                mode='lines'
+            ),
+            secondary_y=True,
+        )
+
+        note = correlation_note(analytics)
+        if note:
+            fig.add_annotation(
+                text=note, xref='paper', yref='paper', x=0, y=-0.15,
+                showarrow=False, font=dict(size=12, color='#6c757d'), xanchor='left'
+            )
+
     # Update layout
     fig.update_layout(
         title_text="Electric Vehicles and PM2.5 Trends Over Time",
@@ -119,7 +380,8 @@ def create_pm25_ev_chart(combined_df):
             xanchor='right',
             x=1
         ),
-        margin=dict(l=50, r=50, b=50, t=80),
+        # Extra room below for the correlation note
+        margin=dict(l=50, r=50, b=90 if note else 50, t=80),
         height=500,
         plot_bgcolor='rgba(0,0,0,0)',
         xaxis=dict(
@@ -128,6 +390,8 @@ def create_pm25_ev_chart(combined_df):
             dtick=1  # Show every year
         )
     )
+    if x_range is not None:
+        fig.update_xaxes(range=list(x_range))
 
     # Set y-axes titles and styling
     fig.update_yaxes(
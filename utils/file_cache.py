@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from utils.config import CACHE_DIR, CACHE_ENABLED
+
+try:
+    import pyarrow  # noqa: F401
+    CACHE_FORMAT = 'feather'
+except ImportError:
+    CACHE_FORMAT = 'pickle'
+
+
+def _source_stamp(file_path, version):
+    """Identify a version of a source file by its path, size and mtime"""
+    stat = os.stat(file_path)
+    return {
+        'path': str(Path(file_path).resolve()),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'version': version
+    }
+
+
+class FileCache:
+    """On-disk cache of per-file results, invalidated when the source file changes.
+
+    Each source file gets a data file (Feather when pyarrow is available,
+    pickle otherwise) next to a small JSON stamp of the source's path,
+    size and mtime, in a subdirectory named after the source's directory.
+    Both are written with an atomic rename, so several processes can
+    share one cache directory. With memory=True results are also kept in
+    this process, so reloading after one file changes only touches that
+    file. Bump version when the shape of the cached results changes, so
+    entries written by older code are ignored.
+    """
+
+    def __init__(self, name, cache_dir=None, enabled=CACHE_ENABLED, memory=False, version=1):
+        self.dir = Path(cache_dir or CACHE_DIR) / name
+        self.enabled = enabled
+        self.version = version
+        self.memory = {} if memory else None
+
+    def stamp(self, file_path):
+        """Current stamp of a source file, or None if it can't be read"""
+        try:
+            return _source_stamp(file_path, self.version)
+        except OSError:
+            return None
+
+    def _paths(self, file_path):
+        # One subdirectory per source directory, so regions' same-named files don't share entries
+        source = Path(file_path).resolve()
+        entry_dir = self.dir / hashlib.sha1(str(source.parent).encode()).hexdigest()[:12]
+        return entry_dir / f"{source.name}.{CACHE_FORMAT}", entry_dir / f"{source.name}.json"
+
+    def get(self, file_path):
+        """Return the cached frame for file_path, or None if missing or stale"""
+        if not self.enabled:
+            return None
+
+        data_path, stamp_path = self._paths(file_path)
+        try:
+            current = _source_stamp(file_path, self.version)
+            if self.memory is not None and file_path in self.memory:
+                stamp, df = self.memory[file_path]
+                if stamp == current:
+                    return df
+
+            with open(stamp_path) as f:
+                stamp = json.load(f)
+            if stamp != current:
+                return None
+            if CACHE_FORMAT == 'feather':
+                df = pd.read_feather(data_path)
+            else:
+                df = pd.read_pickle(data_path)
+            self._remember(file_path, stamp, df)
+            return df
+        except (OSError, ValueError):
+            return None
+        except Exception as e:
+            print(f"Error reading cache for {Path(file_path).name}: {str(e)}")
+            return None
+
+    def put(self, file_path, df):
+        """Store df as the result for the current version of file_path"""
+        if not self.enabled:
+            return
+
+        data_path, stamp_path = self._paths(file_path)
+        try:
+            data_path.parent.mkdir(parents=True, exist_ok=True)
+            stamp = _source_stamp(file_path, self.version)
+
+            tmp_data = data_path.with_name(f"{data_path.name}.{os.getpid()}.tmp")
+            if CACHE_FORMAT == 'feather':
+                df.reset_index(drop=True).to_feather(tmp_data)
+            else:
+                df.to_pickle(tmp_data)
+            os.replace(tmp_data, data_path)
+
+            tmp_stamp = stamp_path.with_name(f"{stamp_path.name}.{os.getpid()}.tmp")
+            with open(tmp_stamp, 'w') as f:
+                json.dump(stamp, f)
+            os.replace(tmp_stamp, stamp_path)
+            self._remember(file_path, stamp, df)
+        except Exception as e:
+            print(f"Error caching {Path(file_path).name}: {str(e)}")
+
+    def forget(self, data_dir):
+        """Drop the in-memory results of the files directly in data_dir"""
+        if self.memory is None:
+            return
+        data_dir = Path(data_dir).resolve()
+        for file_path in list(self.memory):
+            if Path(file_path).resolve().parent == data_dir:
+                self.memory.pop(file_path, None)
+
+    def _remember(self, file_path, stamp, df):
+        if self.memory is not None:
+            self.memory[file_path] = (stamp, df)
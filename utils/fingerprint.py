@@ -0,0 +1,70 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from utils.config import CACHE_DIR, CACHE_ENABLED
+
+# Content digests by resolved path, as (size, mtime_ns, sha1); loaded from disk on first use
+_digests = None
+
+
+def _digest_path(cache_dir=None):
+    return Path(cache_dir or CACHE_DIR) / 'digests.json'
+
+
+def _load_digests(cache_dir=None):
+    global _digests
+    if _digests is None:
+        try:
+            with open(_digest_path(cache_dir)) as f:
+                _digests = {path: tuple(entry) for path, entry in json.load(f).items()}
+        except (OSError, ValueError):
+            _digests = {}
+    return _digests
+
+
+def _save_digests(cache_dir=None):
+    if not CACHE_ENABLED:
+        return
+    path = _digest_path(cache_dir)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(_digests, f)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Error saving file digests: {str(e)}")
+
+
+def file_digest(file_path, cache_dir=None):
+    """SHA-1 of a file's contents, read again only when its size or mtime changes"""
+    digests = _load_digests(cache_dir)
+    path = str(Path(file_path).resolve())
+    stat = os.stat(path)
+    entry = digests.get(path)
+    if entry is not None and entry[:2] == (stat.st_size, stat.st_mtime_ns):
+        return entry[2]
+
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    digests[path] = (stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+    _save_digests(cache_dir)
+    return digests[path][2]
+
+
+def fingerprint(file_paths, **rules):
+    """Short hash of the files' names and contents and of the rules applied to them
+
+    Files are identified by name, not by full path, so the same data
+    copied to another directory or machine has the same fingerprint.
+    Rules can be anything JSON-serializable.
+    """
+    digest = hashlib.sha1()
+    for file_path in sorted(file_paths, key=lambda path: Path(path).name):
+        digest.update(f"{Path(file_path).name}:{file_digest(file_path)}\n".encode())
+    digest.update(json.dumps(rules, sort_keys=True, default=str).encode())
+    return digest.hexdigest()[:16]
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+# Fuel groups with their own summary card; a fuel is in a group when its name contains it
+FUEL_GROUPS = ('Electric', 'Hybrid', 'Gasoline')
+
+COLORS = {
+    'Electric': '#2ca02c',  # Green for electric
+    'Gasoline': '#ff7f0e',  # Orange for gasoline
+    'Diesel': '#1f77b4',  # Blue for diesel
+    'Hybrid': '#9467bd',  # Purple for hybrid
+    'Other': '#7f7f7f'  # Gray for others
+}
+
+
+def normalize_fuel(fuel, mapping=None):
+    """Title-case raw fuel names (and apply mapping) as a categorical.
+
+    The string work runs once per distinct name rather than once per row.
+    Categories come out sorted, so sorting by Fuel sorts by name.
+    """
+    codes, uniques = pd.factorize(fuel)
+    names = pd.Index(uniques, dtype=object).str.strip().str.replace('-', ' ').str.title()
+    return _remap(codes, names, mapping)
+
+
+def fuel_categorical(fuel, mapping=None):
+    """Fuel names, already normalized, as a sorted categorical with mapping applied"""
+    if isinstance(fuel.dtype, pd.CategoricalDtype):
+        codes, names = fuel.cat.codes.to_numpy(), pd.Index(fuel.cat.categories, dtype=object)
+    else:
+        codes, names = pd.factorize(fuel)
+        names = pd.Index(names, dtype=object)
+    return _remap(codes, names, mapping)
+
+
+def _remap(codes, names, mapping):
+    """Categorical from row codes into names, with names mapped, merged and sorted"""
+    if mapping:
+        names = pd.Index([mapping.get(name, name) for name in names], dtype=object)
+    new_codes, categories = pd.factorize(names, sort=True)
+    codes = np.asarray(codes)
+    # -1 (a missing name) stays missing
+    row_codes = np.where(codes >= 0, new_codes[codes] if len(new_codes) else -1, -1)
+    return pd.Categorical.from_codes(row_codes, categories=pd.Index(categories, dtype=object))
+
+
+def fuel_color(fuel):
+    """Bar color for a fuel: green for anything electric, else by its first word"""
+    if 'Electric' in fuel:
+        return COLORS['Electric']
+    return COLORS.get(fuel.split()[0], COLORS['Other'])
+
+
+def fuel_group_flags(fuels):
+    """{group: bool array} marking which of the given fuel names are in each group"""
+    return {group: np.array([group in fuel for fuel in fuels], dtype=bool) for group in FUEL_GROUPS}
+
@@ -0,0 +1,58 @@
+import gzip
+import hashlib
+import threading
+
+from flask import Response
+from plotly.io.json import to_json_plotly
+
+
+class LayoutSnapshot:
+    """The page layout as ready-to-send JSON, built once per data version.
+
+    build(data) returns the layout component for a data snapshot (None
+    while loading), and key names that snapshot. Its JSON is encoded and
+    gzipped the first time the key is asked for; later page loads only
+    copy bytes, and a browser that already has this version gets a 304
+    from its ETag.
+    """
+
+    def __init__(self, build, max_entries=4):
+        self.build = build
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def after_fork(self):
+        """Replace the lock, which a thread that is gone after a fork may have held"""
+        self._lock = threading.Lock()
+
+    def get(self, key, data):
+        """(etag, json bytes, gzipped json bytes) for key, building it from data if needed"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                body = to_json_plotly(self.build(data)).encode()
+                entry = (hashlib.sha1(body).hexdigest()[:20], body, gzip.compress(body, 6))
+                if len(self._entries) >= self.max_entries:
+                    self._entries.clear()
+                self._entries[key] = entry
+        return entry
+
+    def response(self, key, data, request):
+        """Conditional, gzipped when accepted, response for the layout of key"""
+        etag, body, compressed = self.get(key, data)
+        if 'gzip' in request.accept_encodings:
+            response = Response(compressed, mimetype='application/json')
+            response.headers['Content-Encoding'] = 'gzip'
+            etag = f"{etag}-gz"
+        else:
+            response = Response(body, mimetype='application/json')
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.set_etag(etag)
+        # Always revalidate: the same URL serves a new layout after a reload
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
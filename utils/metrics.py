@@ -0,0 +1,193 @@
+import json
+import logging
+import os
+import resource
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+from utils.config import METRICS
+
+# Off by default; when off, stage() hands back one shared no-op object
+ENABLED = METRICS != '0'
+TRACE_MEMORY = METRICS == 'memory'
+
+logger = logging.getLogger('metrics')
+if ENABLED and not logger.handlers:
+    # One JSON object per line, on stderr
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+if TRACE_MEMORY and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+# Stage attributes that aren't reported as fields of its log line
+_INTERNAL = {'name', 'rows', 'fields', 'peak', 'base', 'start'}
+
+_lock = threading.Lock()
+_local = threading.local()
+_totals = {}
+_recent = deque(maxlen=200)
+
+
+class Stage:
+    """Times one stage; set `rows` (and any other field) inside the with block.
+
+    With memory tracing on, peak_bytes is the most memory allocated above
+    the level at the start of the stage, nested stages included. The trace
+    is process-wide, so stages running at the same time on other threads
+    show up in each other's peaks.
+    """
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.rows = None
+        self.fields = fields
+        self.peak = 0
+
+    def __enter__(self):
+        if TRACE_MEMORY:
+            stack = _stack()
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+            self.base = current
+            stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        entry = {'stage': self.name, 'seconds': round(seconds, 6), 'rows': self.rows}
+        if TRACE_MEMORY:
+            stack = _stack()
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            stack.pop()
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, self.peak)
+            entry['peak_bytes'] = self.peak - self.base
+        if exc_type is not None:
+            entry['error'] = exc_type.__name__
+        entry.update(self.fields)
+        entry.update({key: value for key, value in vars(self).items() if key not in _INTERNAL})
+        record(entry)
+        return False
+
+
+class _NullStage:
+    """Stand-in when metrics are off: accepts the same calls and does nothing"""
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+NULL_STAGE = _NullStage()
+
+
+def _stack():
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    return _local.stack
+
+
+def stage(name, **fields):
+    """Context manager timing a named stage; extra fields go into its log line"""
+    if not ENABLED:
+        return NULL_STAGE
+    return Stage(name, fields)
+
+
+def timed_iter(name, iterable, **fields):
+    """Yield from iterable, timing each step (e.g. a chunked CSV read) as a stage"""
+    if not ENABLED:
+        return iterable
+    return _timed_iter(name, iterable, fields)
+
+
+def _timed_iter(name, iterable, fields):
+    iterator = iter(iterable)
+    while True:
+        with stage(name, **fields) as s:
+            item = next(iterator, None)
+            if item is not None:
+                s.rows = len(item)
+        if item is None:
+            return
+        yield item
+
+
+def record(entry, log=True):
+    """Add one stage entry to the running totals and the recent list"""
+    with _lock:
+        totals = _totals.setdefault(entry['stage'], {
+            'count': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'rows': 0, 'peak_bytes': 0
+        })
+        totals['count'] += 1
+        totals['seconds'] += entry['seconds']
+        totals['max_seconds'] = max(totals['max_seconds'], entry['seconds'])
+        totals['rows'] += entry.get('rows') or 0
+        totals['peak_bytes'] = max(totals['peak_bytes'], entry.get('peak_bytes') or 0)
+        _recent.append(entry)
+    for entries in getattr(_local, 'collecting', ()):
+        entries.append(entry)
+    if log:
+        logger.info(json.dumps(entry, default=str))
+
+
+@contextmanager
+def collect():
+    """Also gather the entries recorded in this block, to send back from a worker process"""
+    entries = []
+    if not ENABLED:
+        yield entries
+        return
+    if not hasattr(_local, 'collecting'):
+        _local.collecting = []
+    _local.collecting.append(entries)
+    try:
+        yield entries
+    finally:
+        _local.collecting.remove(entries)
+
+
+def merge(entries):
+    """Fold in entries collected in another process; they were logged there already"""
+    for entry in entries:
+        record(entry, log=False)
+
+
+def snapshot():
+    """Per-stage totals and the most recent entries, for the metrics endpoint"""
+    with _lock:
+        stages = {name: dict(totals) for name, totals in _totals.items()}
+        recent = list(_recent)
+    for totals in stages.values():
+        totals['mean_seconds'] = totals['seconds'] / totals['count']
+    return {
+        'enabled': ENABLED,
+        'trace_memory': TRACE_MEMORY,
+        'pid': os.getpid(),
+        # ru_maxrss is in kilobytes on Linux
+        'max_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        'stages': stages,
+        'recent': recent
+    }
+
+
+def after_fork():
+    """Replace the lock in a forked worker, where the thread that held it may be gone"""
+    global _lock
+    _lock = threading.Lock()
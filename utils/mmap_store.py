@@ -0,0 +1,51 @@
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from utils.config import REGION_CACHE_SIZE
+
+
+def write_arrays(root, version, arrays, meta, keep=REGION_CACHE_SIZE):
+    """Write named numpy arrays and a JSON meta file to root/version.
+
+    The directory is written under a temporary name and renamed into place,
+    so readers only ever see complete stores. If another process already
+    wrote the same version, its copy is kept. Of the stores for other
+    versions, only the keep - 1 most recently used (by mtime, which
+    opening a stored snapshot touches) are kept. Returns the store's path.
+    """
+    root = Path(root)
+    path = root / version
+    if not path.exists():
+        tmp_path = root / f"{version}.{os.getpid()}.tmp"
+        tmp_path.mkdir(parents=True, exist_ok=True)
+        for name, values in arrays.items():
+            np.save(tmp_path / f"{name}.npy", values)
+        with open(tmp_path / 'meta.json', 'w') as f:
+            json.dump(meta, f)
+        try:
+            os.rename(tmp_path, path)
+        except OSError:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    others = []
+    for other in root.iterdir():
+        if other != path and not other.name.endswith('.tmp'):
+            try:
+                others.append((other.stat().st_mtime, other))
+            except FileNotFoundError:
+                continue
+    for _, other in sorted(others, reverse=True)[max(keep - 1, 0):]:
+        shutil.rmtree(other, ignore_errors=True)
+    return path
+
+
+def open_arrays(path, names):
+    """Memory-map the named arrays of a store, returning (arrays, meta)"""
+    path = Path(path)
+    with open(path / 'meta.json') as f:
+        meta = json.load(f)
+    return {name: np.load(path / f"{name}.npy", mmap_mode='r') for name in names}, meta
@@ -0,0 +1,139 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.config import CACHE_DIR
+from utils.downsample import SeriesPyramid
+from utils.mmap_store import open_arrays, write_arrays
+
+PM25_COLUMN = 'Daily Mean PM2.5 Concentration'
+EPOCH = np.datetime64('1970-01-01', 'D')
+
+
+class PM25Store:
+    """Daily PM2.5 readings and their rollups in memory-mapped numpy arrays.
+
+    The daily series is kept as (day, site code, concentration) sorted by
+    site and day. Monthly and yearly sums and counts are precomputed per
+    site and statewide as dense arrays, so any mean is a division and a
+    slice. Arrays are opened with mmap_mode='r' and shared by every process
+    that opens the same store.
+    """
+
+    DAILY = ('day', 'site', 'concentration')
+    ROLLUPS = (
+        'site_month_sum', 'site_month_count', 'state_month_sum', 'state_month_count',
+        'state_day_sum', 'state_day_count'
+    )
+
+    def __init__(self, path):
+        self.path = Path(path)
+        arrays, meta = open_arrays(self.path, self.DAILY + self.ROLLUPS)
+        self.sites = meta['sites']
+        self.site_codes = {site: code for code, site in enumerate(self.sites)}
+        self.first_year = meta['first_year']
+        self.first_day = meta['first_day']
+        self.n_years = meta['n_years']
+        self.arrays = arrays
+        self._pyramids = {}
+
+    @classmethod
+    def cached(cls, version, cache_dir=None):
+        """The store already written for version, or None"""
+        path = Path(cache_dir or CACHE_DIR) / 'pm25_store' / version
+        return cls(path) if path.exists() else None
+
+    @classmethod
+    def build(cls, df, version, cache_dir=None):
+        """Write a frame of daily readings (Date, Site ID, concentration) to disk and open it"""
+        store = cls.cached(version, cache_dir)
+        if store is not None:
+            return store
+        root = Path(cache_dir or CACHE_DIR) / 'pm25_store'
+
+        df = df[df[PM25_COLUMN].notnull()]
+        sites = sorted(int(s) for s in df['Site ID'].unique())
+        site = df['Site ID'].map({s: code for code, s in enumerate(sites)}).to_numpy(dtype=np.int32)
+        day = (df['Date'].to_numpy(dtype='datetime64[D]') - EPOCH).astype(np.int32)
+        concentration = df[PM25_COLUMN].to_numpy(dtype=np.float64)
+        year = df['Date'].dt.year.to_numpy()
+        first_year = int(year.min())
+        n_years = int(year.max()) - first_year + 1
+        month = (year - first_year) * 12 + df['Date'].dt.month.to_numpy() - 1
+        first_day = int(day.min())
+        n_days = int(day.max()) - first_day + 1
+        n_months = n_years * 12
+
+        # Rollups are summed in float64 from the original readings
+        site_month = site.astype(np.int64) * n_months + month
+        size = len(sites) * n_months
+        order = np.lexsort((day, site))
+        arrays = {
+            'day': day[order],
+            'site': site[order],
+            'concentration': concentration[order].astype(np.float32),
+            'site_month_sum': np.bincount(site_month, concentration, size).reshape(len(sites), n_months),
+            'site_month_count': np.bincount(site_month, minlength=size).reshape(len(sites), n_months),
+            'state_month_sum': np.bincount(month, concentration, n_months),
+            'state_month_count': np.bincount(month, minlength=n_months),
+            'state_day_sum': np.bincount(day - first_day, concentration, n_days),
+            'state_day_count': np.bincount(day - first_day, minlength=n_days)
+        }
+        meta = {'sites': sites, 'first_year': first_year, 'n_years': n_years, 'first_day': first_day}
+        return cls(write_arrays(root, version, arrays, meta))
+
+    def _sums(self, site_id):
+        """Monthly sums and counts for one site, or statewide when site_id is None"""
+        if site_id is None:
+            return self.arrays['state_month_sum'], self.arrays['state_month_count']
+        code = self.site_codes[int(site_id)]
+        return self.arrays['site_month_sum'][code], self.arrays['site_month_count'][code]
+
+    def monthly(self, site_id=None):
+        """Mean PM2.5 by year and month"""
+        sums, counts = self._sums(site_id)
+        months = np.nonzero(counts)[0]
+        return pd.DataFrame({
+            'year': self.first_year + months // 12,
+            'month': months % 12 + 1,
+            'Avg PM2.5': sums[months] / counts[months]
+        })
+
+    def yearly(self, site_id=None):
+        """Mean PM2.5 by year"""
+        sums, counts = self._sums(site_id)
+        sums = np.asarray(sums).reshape(self.n_years, 12).sum(axis=1)
+        counts = np.asarray(counts).reshape(self.n_years, 12).sum(axis=1)
+        years = np.nonzero(counts)[0]
+        return pd.DataFrame({
+            'year': self.first_year + years,
+            'Avg PM2.5': sums[years] / counts[years]
+        })
+
+    def daily(self, site_id=None):
+        """Daily readings for one site, or the statewide daily mean"""
+        if site_id is None:
+            counts = self.arrays['state_day_count']
+            days = np.nonzero(counts)[0]
+            return pd.DataFrame({
+                'Date': EPOCH + self.first_day + days,
+                'Avg PM2.5': self.arrays['state_day_sum'][days] / counts[days]
+            })
+
+        code = self.site_codes[int(site_id)]
+        site = self.arrays['site']
+        lo, hi = np.searchsorted(site, code, side='left'), np.searchsorted(site, code, side='right')
+        return pd.DataFrame({
+            'Date': EPOCH + self.arrays['day'][lo:hi],
+            'Avg PM2.5': self.arrays['concentration'][lo:hi]
+        })
+
+    def daily_pyramid(self, site_id=None):
+        """The daily series as a SeriesPyramid over day numbers, built on first use"""
+        pyramid = self._pyramids.get(site_id)
+        if pyramid is None:
+            daily = self.daily(site_id)
+            days = (daily['Date'].to_numpy(dtype='datetime64[D]') - EPOCH).astype(np.int64)
+            pyramid = self._pyramids[site_id] = SeriesPyramid(days, daily['Avg PM2.5'].to_numpy(dtype=np.float64))
+        return pyramid
@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from utils.config import DATA_DIR
+from utils.state import DataState
+from utils.watcher import DataWatcher
+
+
+class RegionCache:
+    """One DataState per region, loaded on first use.
+
+    regions maps each region name to the region argument of the loader
+    (None for files directly in the data directory). At most max_regions
+    are kept loaded; the least recently used is dropped past that, except
+    the default region, which page loads always need and so stays pinned,
+    and the region just asked for, so with max_regions=1 the default and
+    the last other region asked for are both held.
+    on_evict(data_dir) is called for each dropped region, to free anything
+    else held for it. version(data_dir) gives the current version of a
+    region's files, to compare with a loaded snapshot's after a fork.
+    """
+
+    def __init__(self, loader, regions, default, max_regions=4, background=True, data_dir=None, on_evict=None,
+                 version=None):
+        self.loader = loader
+        self.regions = dict(regions)
+        self.default = default
+        self.max_regions = max_regions
+        self.background = background
+        self.data_dir = Path(data_dir or DATA_DIR)
+        self.on_evict = on_evict
+        self.version = version
+        self._states = OrderedDict()
+        self._watchers = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def names(self):
+        return list(self.regions)
+
+    def name(self, region=None):
+        """The region a name refers to: the default for None or an unknown name"""
+        return region if region in self.regions else self.default
+
+    def region_dir(self, region):
+        path = self.regions[region]
+        return self.data_dir / path if path else self.data_dir
+
+    def get(self, region=None):
+        """DataState of a region (the default for None or an unknown name), loading it if new"""
+        region = self.name(region)
+
+        with self._lock:
+            state = self._states.get(region)
+            if state is not None:
+                self._states.move_to_end(region)
+                return state
+
+            path = self.regions[region]
+            state = DataState(lambda: self.loader(region=path))
+            self._states[region] = state
+            watcher = DataWatcher(state, self.region_dir(region))
+            self._watchers[region] = watcher
+            self._evict(region)
+
+        # Files changed from here on trigger a reload
+        watcher.check()
+
+        if self.background:
+            state.load_async()
+        else:
+            state.load()
+        return state
+
+    def _evict(self, keep):
+        """Drop least recently used regions beyond max_regions, never the default or keep"""
+        for region in list(self._states):
+            if len(self._states) <= self.max_regions:
+                break
+            if region not in (self.default, keep):
+                del self._states[region]
+                del self._watchers[region]
+                if self.on_evict is not None:
+                    self.on_evict(self.region_dir(region))
+
+    def loaded(self):
+        """Names of the regions currently held, least recently used first"""
+        with self._lock:
+            return list(self._states)
+
+    def check(self):
+        """Reload any held region whose data files changed"""
+        with self._lock:
+            watchers = list(self._watchers.values())
+        for watcher in watchers:
+            watcher.check()
+
+    def _run(self, interval):
+        while True:
+            time.sleep(interval)
+            self.check()
+
+    def after_fork(self):
+        """Make the cache usable in a freshly forked worker process
+
+        Only the forking thread survives a fork, so locks another thread
+        held at that moment would never be released, and the watcher
+        thread is gone; both are replaced here. Loaded snapshots are kept,
+        shared with the parent copy-on-write, unless the parent forked in
+        the middle of a reload: a region whose files no longer match its
+        snapshot's version is reloaded in the background.
+        """
+        self._lock = threading.Lock()
+        for region, state in self._states.items():
+            state.after_fork()
+            self._watchers[region].after_fork()
+            if self._stale(region, state):
+                state.load_async()
+        if self._thread is not None:
+            interval = self._interval
+            self._thread = None
+            self.watch(interval)
+
+    def _stale(self, region, state):
+        """Whether a state's snapshot is missing or older than its region's files"""
+        if state.snapshot is None:
+            return state.error is None
+        if self.version is None:
+            return False
+        try:
+            return state.snapshot['version'] != self.version(self.region_dir(region))
+        except Exception as e:
+            print(f"Error checking {region} data version: {str(e)}")
+            return False
+
+    def watch(self, interval):
+        """Check held regions for changed files every interval seconds on a daemon thread"""
+        self._interval = interval
+        if self._thread is None:
+            self.check()
+            self._thread = threading.Thread(target=self._run, args=(interval,), name='region-watcher', daemon=True)
+            self._thread.start()
+        return self._thread
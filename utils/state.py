@@ -0,0 +1,52 @@
+import threading
+
+
+class DataState:
+    """Loaded dashboard data, which may still be loading in the background.
+
+    Callbacks read `snapshot` once and use that dict for the whole request;
+    loading replaces it with a single assignment, so a reader never sees a
+    half-built set of frames.
+    """
+
+    def __init__(self, loader, on_load=None):
+        self.loader = loader
+        self.on_load = on_load
+        self.snapshot = None
+        self.error = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self.snapshot is not None
+
+    def after_fork(self):
+        """Replace the lock and loader thread, which don't carry over into a forked process"""
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def load(self):
+        """Load the data in the calling thread, replacing the current snapshot"""
+        with self._lock:
+            try:
+                self.snapshot = self.loader()
+                self.error = None
+            except Exception as e:
+                self.error = str(e)
+                print(f"Error loading dashboard data: {str(e)}")
+                return
+
+            # Work that should be done before the first request for the new data
+            if self.on_load is not None:
+                try:
+                    self.on_load(self.snapshot)
+                except Exception as e:
+                    print(f"Error preparing loaded data: {str(e)}")
+
+    def load_async(self):
+        """Start loading on a daemon thread and return immediately"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self.load, name='data-loader', daemon=True)
+            self._thread.start()
+        return self._thread
@@ -0,0 +1,54 @@
+import os
+from pathlib import Path
+
+from utils.config import DATA_DIR
+
+
+def scan_data_files(data_dir):
+    """(size, mtime) of every vehicle and PM2.5 file in data_dir"""
+    stamps = {}
+    for entry in os.scandir(data_dir):
+        name = entry.name
+        if name.endswith('.csv') and (name.startswith('vehicle') or name.startswith('pm2.5-')):
+            stat = entry.stat()
+            stamps[name] = (stat.st_size, stat.st_mtime_ns)
+    return stamps
+
+
+class DataWatcher:
+    """Reloads the DataState when the files in its data directory change.
+
+    RegionCache.watch calls check() on a timer. Polling rather than
+    inotify keeps it dependency-free and working on network mounts. The
+    reload goes through the loader's per-file caches, so only new or
+    modified files are parsed.
+    """
+
+    def __init__(self, state, data_dir=None):
+        self.state = state
+        self.data_dir = Path(data_dir or DATA_DIR)
+        self._stamps = None
+
+    def check(self):
+        """Reload if any data file was added, changed or removed since the last check"""
+        try:
+            stamps = scan_data_files(self.data_dir)
+        except OSError as e:
+            print(f"Error scanning {self.data_dir}: {str(e)}")
+            return False
+
+        changed = self._stamps is not None and stamps != self._stamps
+        self._stamps = stamps
+        if changed:
+            print(f"Data files changed in {self.data_dir}, reloading")
+            self.state.load()
+        return changed
+
+    def after_fork(self):
+        """Record the files as they are now, in a freshly forked process
+
+        The parent may have recorded new stamps without having finished
+        the reload they triggered, so its stamps aren't trusted.
+        """
+        self._stamps = None
+        self.check()
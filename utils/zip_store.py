@@ -0,0 +1,89 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.config import CACHE_DIR
+from utils.cube import FuelYearCube
+from utils.fuels import fuel_categorical
+from utils.mmap_store import open_arrays, write_arrays
+
+ZIP_DIGITS = 5
+
+
+class ZipStore:
+    """Zip-code level vehicle counts kept in memory-mapped numpy arrays.
+
+    Rows are (zip, year, fuel code, vehicles), sorted by zip and then year,
+    so any zip or zip-prefix query is two binary searches plus a bincount
+    over the matching slice. Arrays are opened with mmap_mode='r', so the
+    OS pages them in on demand and processes share the same pages.
+    """
+
+    COLUMNS = ('zip', 'year', 'fuel', 'vehicles')
+
+    def __init__(self, path):
+        self.path = Path(path)
+        arrays, meta = open_arrays(self.path, self.COLUMNS)
+        self.fuels = meta['fuels']
+        self.years = np.array(meta['years'], dtype=int)
+        self.zips = arrays['zip']
+        self.year_codes = arrays['year']
+        self.fuel_codes = arrays['fuel']
+        self.vehicles = arrays['vehicles']
+
+    @classmethod
+    def build(cls, df, version, cache_dir=None):
+        """Write a (Zip, Fuel, Vehicles, year) frame to disk and open it.
+
+        Stores are named by data version, so workers loading the same data
+        share one copy; only the most recently used stores for other versions
+        are kept.
+        """
+        root = Path(cache_dir or CACHE_DIR) / 'zip'
+        if (root / version).exists():
+            return cls(root / version)
+
+        fuel = fuel_categorical(df['Fuel']).remove_unused_categories()
+        fuels = list(fuel.categories)
+        years = sorted(int(y) for y in df['year'].unique())
+        order = np.lexsort((df['year'].to_numpy(), df['Zip'].to_numpy()))
+        arrays = {
+            'zip': df['Zip'].to_numpy(dtype=np.int32)[order],
+            'year': np.searchsorted(years, df['year'].to_numpy(dtype=int)).astype(np.int16)[order],
+            'fuel': fuel.codes.astype(np.int16)[order],
+            'vehicles': df['Vehicles'].to_numpy(dtype=np.int64)[order]
+        }
+
+        return cls(write_arrays(root, version, arrays, {'fuels': fuels, 'years': years}))
+
+    def _bounds(self, zip_prefix):
+        """Row slice [lo, hi) of zips starting with zip_prefix"""
+        lo = int(zip_prefix.ljust(ZIP_DIGITS, '0'))
+        hi = int(zip_prefix.ljust(ZIP_DIGITS, '9'))
+        return np.searchsorted(self.zips, lo, side='left'), np.searchsorted(self.zips, hi, side='right')
+
+    def frame(self, zip_prefix):
+        """(Fuel, Vehicles, year) totals for zips starting with zip_prefix"""
+        zip_prefix = (zip_prefix or '').strip()
+        if not zip_prefix.isdigit() or len(zip_prefix) > ZIP_DIGITS:
+            return pd.DataFrame(columns=['Fuel', 'Vehicles', 'year'])
+
+        lo, hi = self._bounds(zip_prefix)
+        n_fuels = len(self.fuels)
+        if hi <= lo:
+            return pd.DataFrame(columns=['Fuel', 'Vehicles', 'year'])
+        cells = self.year_codes[lo:hi].astype(np.int64) * n_fuels + self.fuel_codes[lo:hi]
+        totals = np.bincount(cells, weights=self.vehicles[lo:hi], minlength=len(self.years) * n_fuels)
+        present = np.bincount(cells, minlength=len(self.years) * n_fuels) > 0
+
+        cell_idx = np.nonzero(present)[0]
+        return pd.DataFrame({
+            'Fuel': [self.fuels[code] for code in cell_idx % n_fuels],
+            'Vehicles': totals[cell_idx].astype(np.int64),
+            'year': self.years[cell_idx // n_fuels]
+        })
+
+    def cube(self, zip_prefix):
+        """FuelYearCube for a zip-code drill-down"""
+        return FuelYearCube(self.frame(zip_prefix))